@@ -1,20 +1,50 @@
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import re
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 
 from conventions import Calculate
+from preprocess import concat_worklogs, sort_worklogs
 
 
-def calculate_metrics_by_year(worklogs, years): 
+def calculate_metrics_by_year(worklogs, years, absences=None, metrics=None, backend=None, 
+                              partitions=None, facts=True): 
     """
     Calculates employee performance metrics (KPIs), aggregate and unique
     metric by year.
 
     Parameters
     ----------
-    worklogs : pandas.DataFrame
-        Preprocessed worklogs.
+    worklogs : pandas.DataFrame or iterable
+        Preprocessed worklogs, or compacted worklogs including #logs.
     years : list
         List of years to calculate. 
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns), not counted as
+        expected working days.
+    metrics : list or None (default)
+        KPIs to calculate, only computing the features they need. If None,
+        all of them are calculated.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+    partitions : str or None (default)
+        Period of the partitions (pandas period alias, e.g. M) to calculate
+        worklogs and users features holding a single partition of worklogs
+        in memory at a time, then worklogs can be an iterable of parts of 
+        cleaned worklogs. The compacted facts (one row by date, issue and 
+        user) of every partition are stored in PARTITIONS_FOLDER until the 
+        metrics are calculated. If None, worklogs are calculated at once.
+    facts : bool
+        Whether to return the worklogs facts. With partitions, they are only
+        read into memory as a whole if True (True by default).
 
     Returns
     -------
@@ -23,9 +53,189 @@ def calculate_metrics_by_year(worklogs, years):
         set of features extracted from worklogs by employee (index), including
         metrics (KPIs), absolute value and standarized, aggregated metrics and
         final metric. 
+    worklogs_calc : pandas.DataFrame or None
+        Worklogs facts with the position of their issue (issue_id) and
+        project (project_id) in issues and projects. None if partitions and
+        not facts.
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    projects : pandas.DataFrame
+        Projects features extracted from worklogs.
+    info : pandas.Series
+        General information from the dataset.
+
+    See Also
+    --------
+    calculate_worklogs, calculate_worklogs_partitioned, calculate_users_periods, 
+    calculate_metrics, calculate_performance, conventions.py
+    """
+    # temporary folder of the facts of the partitions
+    folder = None
+    if partitions is not None:
+        os.makedirs(Calculate.PARTITIONS_FOLDER, exist_ok=True)
+        folder = tempfile.mkdtemp(dir=Calculate.PARTITIONS_FOLDER)
+    try:
+        # calculation to reuse in different intervals
+        if partitions is None:
+            worklogs_calc, issues, projects, info = calculate_worklogs(worklogs, backend)
+        else:
+            worklogs_calc, issues, projects, info = calculate_worklogs_partitioned(worklogs, folder, 
+                                                                                   partitions, backend)
+
+        # set intervals
+        years = [str(y) for y in years]
+        periods = {year: [str(int(year) * 10000 + 101), str(int(year) * 10000 + 1231)] 
+                   for year in years}
+        # compute data for all the intervals at once
+        data = calculate_users_metrics(worklogs_calc, issues, periods, absences, 
+                                       metrics=metrics, backend=backend)
+        users_and_metrics = split_periods(data, years)
+        
+        if partitions is not None:
+            worklogs_calc = read_worklogs_facts(worklogs_calc) if facts else None
+    finally:
+        if folder is not None:
+            shutil.rmtree(folder, ignore_errors=True)
+        
+    return users_and_metrics, worklogs_calc, issues, projects, info
+
+
+def calculate_metrics_by_window(worklogs, freq='M', length=12, absences=None, metrics=None, 
+                                backend=None, partitions=None, facts=True):
+    """
+    Calculates employee performance metrics (KPIs), aggregate and unique
+    metric in sliding windows of consecutive periods, e.g. trailing 12 months
+    (freq='M', length=12) or quarters (freq='Q', length=1).
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame or iterable
+        Preprocessed worklogs, or compacted worklogs including #logs.
+    freq : str
+        Frequency of the periods (pandas period alias, M by default).
+    length : int
+        Number of periods by window (12 by default), at most the number of
+        periods of the worklogs.
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns), not counted as
+        expected working days.
+    metrics : list or None (default)
+        KPIs to calculate, only computing the features they need. If None,
+        all of them are calculated.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+    partitions : str or None (default)
+        Period of the partitions (pandas period alias, e.g. M) to calculate
+        worklogs and users features holding a single partition of worklogs
+        in memory at a time, then worklogs can be an iterable of parts of 
+        cleaned worklogs. The compacted facts (one row by date, issue and 
+        user) of every partition are stored in PARTITIONS_FOLDER until the 
+        metrics are calculated. If None, worklogs are calculated at once.
+    facts : bool
+        Whether to return the worklogs facts. With partitions, they are only
+        read into memory as a whole if True (True by default).
+
+    Returns
+    -------
+    users_and_metrics : pandas.DataFrame
+        Features, metrics (KPIs) absolute value and standarized, aggregated
+        metrics and final metric by window (last day) and employee (index).
+        Hours by project or issue type not found in the window are missing
+        (NaN).
+    worklogs_calc : pandas.DataFrame or None
+        Worklogs facts with the position of their issue (issue_id) and
+        project (project_id) in issues and projects. None if partitions and
+        not facts.
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    projects : pandas.DataFrame
+        Projects features extracted from worklogs.
+    info : pandas.Series
+        General information from the dataset.
+
+    See Also
+    --------
+    calculate_metrics_by_year, calculate_users_periods
+    """
+    # temporary folder of the facts of the partitions
+    folder = None
+    if partitions is not None:
+        os.makedirs(Calculate.PARTITIONS_FOLDER, exist_ok=True)
+        folder = tempfile.mkdtemp(dir=Calculate.PARTITIONS_FOLDER)
+    try:
+        # calculation to reuse in different intervals
+        if partitions is None:
+            worklogs_calc, issues, projects, info = calculate_worklogs(worklogs, backend)
+        else:
+            worklogs_calc, issues, projects, info = calculate_worklogs_partitioned(worklogs, folder, 
+                                                                                   partitions, backend)
+
+        # set windows, from the period of the first day to the last day
+        periods = pd.period_range(info['min_date'], info['max_date'], freq=freq)
+        if not 1 <= length <= len(periods):
+            raise ValueError('Window length must be between 1 and the number of periods (' 
+                             + str(len(periods)) + '): ' + str(length))
+        starts = periods.start_time
+        ends = periods.end_time.normalize()[length - 1:]
+        windows = {end: [start, end] for start, end in zip(starts, ends)}
+        # minimum hours in proportion to the windows length
+        days = (ends - starts[:len(ends)]).days + 1
+        min_hours = Calculate.USERS_MIN_YEARLY_HOURS * (days.to_series().mean() if len(days) else 0) / 365
+        # compute data for all the windows at once
+        data = calculate_users_metrics(worklogs_calc, issues, windows, absences, min_hours, metrics, 
+                                       backend)
+        data = data.rename_axis(index={'period': 'window'})
+        
+        if partitions is not None:
+            worklogs_calc = read_worklogs_facts(worklogs_calc) if facts else None
+    finally:
+        if folder is not None:
+            shutil.rmtree(folder, ignore_errors=True)
+        
+    return data, worklogs_calc, issues, projects, info
+
+
+def calculate_metrics_by_cohort(worklogs, years, cohorts=None, absences=None, metrics=None, 
+                                backend=None, workers=Calculate.WORKERS):
+    """
+    Calculates employee performance metrics (KPIs), aggregate and unique
+    metric by year and cohort of employees, as independent jobs in a pool 
+    of processes. The worklogs facts are stored once as memory-mapped 
+    arrays, read by the jobs without copying them into every process.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs, or compacted worklogs including #logs.
+    years : list
+        List of years to calculate. 
+    cohorts : dict or None (default)
+        Cohorts names as keys and lists of employees (usernames) as values,
+        calculated separately with their worklogs. If None, all the 
+        employees are calculated together.
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns), not counted as
+        expected working days.
+    metrics : list or None (default)
+        KPIs to calculate, only computing the features they need. If None,
+        all of them are calculated.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+    workers : int or None
+        Number of processes. If 1, jobs are calculated in the current 
+        process; if None, one process per CPU core is used (WORKERS by 
+        default).
+
+    Returns
+    -------
+    users_and_metrics : dict
+        Dictionary of pandas.DataFrame, years as keys (or tuples of cohort 
+        and year if cohorts), as in calculate_metrics_by_year.
     worklogs_calc : pandas.DataFrame
-        Preprocessed worklogs including new calculated features from issues
-        and projects.
+        Worklogs facts with the position of their issue (issue_id) and
+        project (project_id) in issues and projects.
     issues : pandas.DataFrame
         Issues features extracted from worklogs.
     projects : pandas.DataFrame
@@ -35,274 +245,1400 @@ def calculate_metrics_by_year(worklogs, years):
 
     See Also
     --------
-    calculate_worklogs, calculate_users_interval, calculate_metrics,
-    calculate_performance, conventions.py
+    calculate_metrics_by_year, calculate_metrics_job, write_worklogs_arrays
+    """
+    # calculation to reuse in different jobs
+    worklogs_calc, issues, projects, info = calculate_worklogs(worklogs, backend)
+    
+    # jobs by cohort and year
+    years = [str(y) for y in years]
+    periods = {year: [str(int(year) * 10000 + 101), str(int(year) * 10000 + 1231)] 
+               for year in years}
+    jobs = [(None, year) for year in years]
+    if cohorts is not None:
+        jobs = [(cohort, year) for cohort in cohorts for year in years]
+    users = [None if cohort is None else [user.lower() for user in cohorts[cohort]] 
+             for cohort, _ in jobs]
+    
+    folder = tempfile.mkdtemp()
+    try:
+        arrays = write_worklogs_arrays(worklogs_calc, folder)
+        # data shared by the jobs, sent once per process
+        shared = (arrays, issues, absences, metrics, backend)
+        args = ([year for _, year in jobs], [periods[year] for _, year in jobs], users)
+        if workers == 1:
+            init_metrics_jobs(*shared)
+            results = list(map(calculate_metrics_job, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), 
+                                     initializer=init_metrics_jobs, initargs=shared) as executor:
+                results = list(executor.map(calculate_metrics_job, *args))
+    finally:
+        _jobs_data.clear()
+        shutil.rmtree(folder, ignore_errors=True)
+    
+    keys = [year if cohorts is None else (cohort, year) for cohort, year in jobs]
+    users_and_metrics = dict(zip(keys, results))
+    
+    return users_and_metrics, worklogs_calc, issues, projects, info
+
+
+# data of the metrics jobs in the current process, set by init_metrics_jobs
+_jobs_data = {}
+
+
+def init_metrics_jobs(arrays, issues, absences=None, metrics=None, backend=None):
+    """
+    Sets the data shared by the metrics jobs run in the current process, 
+    once per process.
+
+    Parameters
+    ----------
+    arrays : dict
+        Arrays of the worklogs facts, from write_worklogs_arrays.
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns).
+    metrics : list or None (default)
+        KPIs to calculate. If None, all of them are calculated.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+
+    See Also
+    --------
+    calculate_metrics_by_cohort, calculate_metrics_job
+    """
+    _jobs_data.update(arrays=arrays, issues=issues, absences=absences, 
+                      metrics=metrics, backend=backend)
+
+
+def calculate_metrics_job(period, interval, users):
+    """
+    Calculates employee performance metrics of a period and cohort, reading
+    the worklogs facts from memory-mapped arrays and the rest of the data
+    set by init_metrics_jobs.
+
+    Parameters
+    ----------
+    period : str
+        Name of the period.
+    interval : list
+        List containing two dates to define the period of time.
+    users : list or None
+        Employees (usernames) of the cohort. If None, all the employees.
+
+    Returns
+    -------
+    users_and_metrics : pandas.DataFrame
+        Features, metrics (KPIs) absolute value and standarized, aggregated
+        metrics and final metric by employee (index). Empty if there are no
+        worklogs of the cohort in the period.
+
+    See Also
+    --------
+    calculate_metrics_by_cohort, init_metrics_jobs, read_worklogs_arrays
+    """
+    worklogs_calc = read_worklogs_arrays(_jobs_data['arrays'], users)
+    interval = pd.to_datetime(interval)
+    if not worklogs_calc['date'].between(interval[0], interval[1]).any():
+        user_dtype = _jobs_data['arrays']['user'][1]
+        return pd.DataFrame(index=pd.CategoricalIndex([], dtype=user_dtype, name='user'))
+    
+    data = calculate_users_metrics(worklogs_calc, _jobs_data['issues'], {period: interval}, 
+                                   _jobs_data['absences'], metrics=_jobs_data['metrics'], 
+                                   backend=_jobs_data['backend'])
+    
+    return split_periods(data, [period])[period]
+
+
+def write_worklogs_arrays(worklogs_calc, folder):
+    """
+    Stores every column of the worklogs facts as an array file (categorical
+    columns by their codes), to be memory-mapped by other processes.
+
+    Parameters
+    ----------
+    worklogs_calc : pandas.DataFrame
+        Worklogs facts.
+    folder : str
+        Folder of the array files.
+
+    Returns
+    -------
+    arrays : dict
+        Columns as keys and tuples of array file and categorical dtype (None
+        if not categorical) as values.
+
+    See Also
+    --------
+    read_worklogs_arrays
     """
+    arrays = {}
+    for col in worklogs_calc.columns:
+        values = worklogs_calc[col]
+        dtype = values.dtype if isinstance(values.dtype, pd.CategoricalDtype) else None
+        values = values.cat.codes.values if dtype is not None else values.values
+        file = os.path.join(folder, str(len(arrays)) + '.npy')
+        np.save(file, values)
+        arrays[col] = (file, dtype)
         
-    # calculation to reuse in different intervals
+    return arrays
+
+
+def read_worklogs_arrays(arrays, users=None):
+    """
+    Reads the worklogs facts from memory-mapped array files. The columns
+    are not copied, only the rows of the selected employees if any.
+
+    Parameters
+    ----------
+    arrays : dict
+        Arrays of the worklogs facts, from write_worklogs_arrays.
+    users : list or None (default)
+        Employees (usernames) to read. If None, all the employees.
+
+    Returns
+    -------
+    worklogs_calc : pandas.DataFrame
+        Worklogs facts.
+
+    See Also
+    --------
+    write_worklogs_arrays
+    """
+    worklogs_calc = {col: np.load(file, mmap_mode='r') for col, (file, _) in arrays.items()}
+    if users is not None:
+        user_codes = arrays['user'][1].categories.get_indexer(users)
+        rows = np.isin(worklogs_calc['user'], user_codes[user_codes >= 0])
+        worklogs_calc = {col: values[rows] for col, values in worklogs_calc.items()}
+    
+    for col, (_, dtype) in arrays.items():
+        if dtype is not None:
+            worklogs_calc[col] = pd.Categorical.from_codes(worklogs_calc[col], dtype=dtype)
+    
+    return pd.DataFrame(worklogs_calc, copy=False)
+
+
+def build_metrics_state(worklogs, years, absences=None):
+    """
+    Calculates employee performance metrics by year, keeping the state of
+    the calculation to update it with new exports.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs, or compacted worklogs including #logs.
+    years : list
+        List of years to calculate. 
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns), not counted as
+        expected working days.
+
+    Returns
+    -------
+    state : dict
+        Compacted worklogs (worklogs), worklogs_calc, issues, projects, info,
+        periods by year (periods), absences and users_and_metrics by year.
+
+    See Also
+    --------
+    update_metrics_state, write_metrics_state, calculate_metrics_by_year
+    """
+    worklogs = compact_worklogs(worklogs)
+    worklogs['#hours'] = worklogs['#hours'].astype('float64')
     worklogs_calc, issues, projects, info = calculate_worklogs(worklogs)
+    
+    state = {'worklogs': worklogs, 'worklogs_calc': worklogs_calc,
+             'issues': issues, 'projects': projects, 'info': info,
+             'periods': {}, 'absences': absences, 'users_and_metrics': {}}
+    
+    return update_metrics_state(state, years=years)
 
-    years = [str(y) for y in years]
-    users_and_metrics = {}
-    for year in years:
-        # set interval
-        interval = [str(int(year) * 10000 + 101), str(int(year) * 10000 + 1231)]
-        # compute data for interval
-        users_calc = calculate_users_interval(worklogs_calc, interval)
-        # obtain metrics
-        metrics = calculate_metrics(users_calc)
-        # obtain metrics by dimension and final performance
-        performance = calculate_performance(metrics)
-        data = users_calc.join(metrics).join(performance, rsuffix='_std')
-        users_and_metrics[year] = data
+
+def update_metrics_state(state, worklogs=None, years=None):
+    """
+    Updates the calculation state with the worklogs of a new export, and 
+    optionally new years. The new export replaces the worklogs between its
+    first and last days, so the history before and after it is kept. Only
+    the issues and projects with changed worklogs are extracted again, and
+    only the years including worklogs of those issues are calculated again.
+
+    Parameters
+    ----------
+    state : dict
+        Calculation state, from build_metrics_state.
+    worklogs : pandas.DataFrame or None (default)
+        Preprocessed worklogs of the new export.
+    years : list or None (default)
+        List of years to add to the calculation.
+
+    Returns
+    -------
+    state : dict
+        Updated calculation state.
+
+    See Also
+    --------
+    build_metrics_state, read_metrics_state
+    """
+    state = dict(state)
+    periods = {}
+    
+    if worklogs is not None and len(worklogs):
+        new = compact_worklogs(worklogs)
+        new['#hours'] = new['#hours'].astype('float64')
+        old = state['worklogs']
+        replaced = old['date'].between(new['date'].min(), new['date'].max())
+        removed = old[replaced]
+        merged = sort_worklogs(concat_worklogs([old[~replaced].copy(), new]))
         
-    return users_and_metrics, worklogs_calc, issues, projects, info
+        # issues with changed worklogs
+        changed = pd.concat([removed, new])
+        touched = changed['issue'].dropna().astype(object).unique()
+        in_touched = merged['issue'].isin(touched)
+        issues = extract_issues(merged[in_touched])
+        issues = pd.concat([set_categories(state['issues'].drop(touched, errors='ignore'), merged), 
+                            issues]).sort_index()
+        issues['%share'] = issues['#hours'] / issues['#hours'].sum()
+        
+        # projects with changed worklogs or issues
+        touched_projects = pd.concat([changed['project'].astype(object), 
+                                      state['issues']['project'].astype(object).reindex(touched),
+                                      issues['project'].astype(object).reindex(touched)])
+        touched_projects = touched_projects.dropna().unique()
+        projects = extract_projects(merged[merged['project'].isin(touched_projects)], 
+                                    issues[issues['project'].isin(touched_projects)])
+        projects = pd.concat([set_categories(state['projects'].drop(touched_projects, errors='ignore'), merged),
+                              projects]).sort_index()
+        projects['%share'] = projects['#hours'] / projects['#hours'].sum()
+        
+        worklogs_calc = extract_facts(merged, issues, projects)
+        
+        # years with worklogs of changed issues
+        dates = pd.concat([merged.loc[in_touched, 'date'], removed['date']])
+        for period, interval in state['periods'].items():
+            interval = pd.to_datetime(interval)
+            if ((dates >= interval[0]) & (dates <= interval[1])).any():
+                periods[period] = state['periods'][period]
+        
+        state.update({'worklogs': merged, 'worklogs_calc': worklogs_calc, 'issues': issues, 
+                      'projects': projects, 'info': extract_info(worklogs_calc)})
+        
+    for year in [str(y) for y in years or []]:
+        periods[year] = [str(int(year) * 10000 + 101), str(int(year) * 10000 + 1231)]
+    
+    if len(periods):
+        data = calculate_users_metrics(state['worklogs_calc'], state['issues'], periods, state['absences'])
+        state['periods'] = {**state['periods'], **periods}
+        state['users_and_metrics'] = {**state['users_and_metrics'], **split_periods(data, list(periods))}
+        state['users_and_metrics'] = {period: state['users_and_metrics'][period] 
+                                      for period in sorted(state['users_and_metrics'])}
+    
+    return state
+
+
+def read_metrics_state(file=Calculate.STATE_FILE):
+    """
+    Reads the calculation state saved in a file.
+
+    Parameters
+    ----------
+    file : str
+        Path of the file (STATE_FILE by default).
+
+    Returns
+    -------
+    state : dict or None
+        Calculation state, None if the file does not exist.
+
+    See Also
+    --------
+    write_metrics_state
+    """
+    if not os.path.exists(file):
+        return None
+    
+    return pd.read_pickle(file)
+
+
+def write_metrics_state(state, file=Calculate.STATE_FILE):
+    """
+    Saves the calculation state in a file.
+
+    Parameters
+    ----------
+    state : dict
+        Calculation state.
+    file : str
+        Path of the file (STATE_FILE by default).
+
+    See Also
+    --------
+    read_metrics_state
+    """
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    pd.to_pickle(state, file)
+
+
+def set_categories(data, worklogs):
+    """
+    Sets the categories of the worklogs categorical columns to the columns
+    and index of issues or projects, to combine them with new ones.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Issues or projects features.
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs.
+
+    Returns
+    -------
+    data : pandas.DataFrame
+        Issues or projects features with the worklogs categories.
+    """
+    data = data.copy()
+    for col in data.columns:
+        if col in worklogs.columns and isinstance(data[col].dtype, pd.CategoricalDtype):
+            data[col] = pd.Categorical(data[col].astype(object), dtype=worklogs[col].dtype)
+    data.index = pd.CategoricalIndex(data.index.astype(object), dtype=worklogs[data.index.name].dtype, 
+                                     name=data.index.name)
+    
+    return data
+
+
+def compact_worklogs(worklogs):
+    """
+    Compacts preprocessed worklogs to one row by date, issue and user, with
+    the sum of hours and the number of logs (#logs). Issues features take the
+    last value and the estimate the maximum, as in extract_issues, so that
+    the calculations from compacted worklogs are the same.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs.
+
+    Returns
+    -------
+    worklogs : pandas.DataFrame
+        Compacted worklogs, including #logs.
+
+    See Also
+    --------
+    calculate_worklogs, extract_issues
+    """
+    keys = ['date', 'issue', 'user']
+    group = worklogs.groupby(keys, observed=True)
+
+    compact = groupby_last(worklogs.drop(['estimate', '#hours'], axis=1), keys)
+    compact['estimate'] = group['estimate'].max()
+    compact['#hours'] = group['#hours'].sum()
+    compact['#logs'] = group.size()
+    if '#logs' in worklogs.columns:
+        compact['#logs'] = group['#logs'].sum()
+
+    compact = compact.reset_index()
+    compact = compact[list(worklogs.columns.drop('#logs', errors='ignore')) + ['#logs']]
+
+    return compact
+
+
+def calculate_worklogs(worklogs, backend=None):
+    """
+    Adds useful features to worklogs non depending on time period.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs, or compacted worklogs including #logs.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+
+    Returns
+    -------
+    worklogs_calc : pandas.DataFrame
+        Worklogs facts (user, date, #hours and #logs if compacted) with the
+        position of their issue (issue_id) and project (project_id) in
+        issues and projects, -1 if unknown.
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    projects : pandas.DataFrame
+        Projects features extracted from worklogs.
+    info : pandas.Series
+        General information from the dataset.
+
+    See Also
+    --------
+    extract_issues, extract_projects, compact_worklogs, conventions.py
+    """
+    # hours may be stored in single precision, sums are done in double
+    worklogs = worklogs.astype({'#hours': 'float64'})
+    
+    issues = extract_issues(worklogs, backend)
+    
+    projects = extract_projects(worklogs, issues, backend)
+
+    worklogs_calc = extract_facts(worklogs, issues, projects)
+    
+    info = extract_info(worklogs_calc)
+    print('------- Worklogs -------')
+    print(info)
+
+    return worklogs_calc, issues, projects, info
+
+
+def calculate_worklogs_partitioned(worklogs, folder, freq=Calculate.PARTITIONS_FREQ, backend=None):
+    """
+    Adds useful features to worklogs non depending on time period, as 
+    calculate_worklogs, holding a single partition of worklogs in memory at
+    a time. Worklogs are split in partitions by date, stored in parquet 
+    format, and two passes are done: the first one extracts the partial 
+    aggregates of issues and projects, which are merged, and the second one
+    extracts the compacted facts (one row by date, issue and user) of every
+    partition, which are stored in parquet format.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame or iterable
+        Preprocessed worklogs, or parts of cleaned worklogs (e.g. by file) 
+        in their order.
+    folder : str
+        Folder in which the files of the facts are stored, removed by the
+        caller. The partitions of worklogs are stored in a temporary folder
+        inside it.
+    freq : str
+        Period of the partitions (pandas period alias, PARTITIONS_FREQ by 
+        default).
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+
+    Returns
+    -------
+    worklogs_calc : list
+        Parquet files of the compacted worklogs facts (user, date, #hours 
+        and #logs) of every partition in dates order, with the position of
+        their issue (issue_id) and project (project_id) in issues and 
+        projects, -1 if unknown. All of them share the users categories.
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    projects : pandas.DataFrame
+        Projects features extracted from worklogs.
+    info : pandas.Series
+        General information from the dataset.
+
+    See Also
+    --------
+    calculate_worklogs, extract_issues_partial, merge_issues_partials,
+    compact_worklogs, read_worklogs_facts, conventions.py
+    """
+    if isinstance(worklogs, pd.DataFrame):
+        worklogs = [worklogs]
+    
+    os.makedirs(folder, exist_ok=True)
+    partitions_folder = tempfile.mkdtemp(dir=folder)
+    try:
+        # split in partitions, one file by part and partition
+        partitions = {}
+        for i, part in enumerate(worklogs):
+            for period, partition in part.groupby(part['date'].dt.to_period(freq)):
+                # only the categories found in the partition
+                categories = partition.select_dtypes('category').columns
+                partition = partition.assign(**{col: partition[col].cat.remove_unused_categories() 
+                                                for col in categories})
+                file = os.path.join(partitions_folder, str(period.ordinal) + '_' + str(i) + '.parquet')
+                partition.to_parquet(file, index=False)
+                partitions.setdefault(period, []).append(file)
+        partitions = [partitions[period] for period in sorted(partitions)]
+        
+        # first pass: partial aggregates of issues and projects
+        issues_partials = []
+        projects_partials = []
+        users = set()
+        for files in partitions:
+            partition = read_worklogs_partition(files)
+            issues_partials.append(extract_issues_partial(partition, backend))
+            projects_hours = aggregate(partition, ['project', 'user'], {'#hours': ('#hours', 'sum')}, 
+                                       backend=backend)
+            projects_partials.append(projects_hours.reset_index())
+            users.update(partition['user'].cat.categories)
+        issues = merge_issues_partials(issues_partials, backend)
+        projects = extract_projects(concat_worklogs(projects_partials), issues, backend)
+        
+        # second pass: compacted facts, with the users of all the partitions
+        users = pd.Index(sorted(users), dtype=object)
+        worklogs_calc = []
+        min_dates, max_dates, logs = [], [], 0
+        for files in partitions:
+            facts = extract_facts(compact_worklogs(read_worklogs_partition(files)), issues, projects)
+            facts['user'] = facts['user'].cat.set_categories(users)
+            file = os.path.join(folder, str(len(worklogs_calc)) + '.parquet')
+            facts.to_parquet(file, index=False)
+            worklogs_calc.append(file)
+            min_dates.append(facts['date'].min())
+            max_dates.append(facts['date'].max())
+            logs += facts['#logs'].sum()
+    finally:
+        shutil.rmtree(partitions_folder, ignore_errors=True)
+    
+    # as extract_info, all the issues and users are found in the facts
+    projects_id = projects.index.get_indexer(issues['project'])
+    info = pd.Series({'min_date': min(min_dates, default=pd.NaT), 
+                      'max_date': max(max_dates, default=pd.NaT),
+                      '#logs': logs, 
+                      '#issues': len(issues), 
+                      '#projects': len(np.unique(projects_id[projects_id >= 0])), 
+                      '#users': len(users)})
+    print('------- Worklogs -------')
+    print(info)
+
+    return worklogs_calc, issues, projects, info
+
+
+def read_worklogs_partition(files):
+    """
+    Reads a partition of worklogs, stored in several parquet files.
+
+    Parameters
+    ----------
+    files : list
+        Files of the partition, in the order of the worklogs parts.
+
+    Returns
+    -------
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs of the partition, hours in double precision.
+
+    See Also
+    --------
+    calculate_worklogs_partitioned
+    """
+    worklogs = concat_worklogs([pd.read_parquet(file) for file in files])
+    # hours may be stored in single precision, sums are done in double
+    worklogs = worklogs.astype({'#hours': 'float64'})
+    
+    return sort_worklogs(worklogs)
+
+
+def read_worklogs_facts(files):
+    """
+    Reads the worklogs facts stored by partition, concatenated into a single
+    dataset.
+
+    Parameters
+    ----------
+    files : list
+        Parquet files of the facts of every partition, in dates order.
+
+    Returns
+    -------
+    worklogs_calc : pandas.DataFrame
+        Worklogs facts with the position of their issue (issue_id) and
+        project (project_id) in issues and projects.
+
+    See Also
+    --------
+    calculate_worklogs_partitioned
+    """
+    return concat_worklogs(pd.read_parquet(file) for file in files)
+
+
+def extract_facts(worklogs, issues, projects):
+    """
+    Extracts worklogs facts, with issues and projects by code (position).
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs, or compacted worklogs including #logs.
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    projects : pandas.DataFrame
+        Projects features extracted from worklogs.
+
+    Returns
+    -------
+    worklogs_calc : pandas.DataFrame
+        Worklogs facts (user, date, #hours and #logs if compacted) with the
+        position of their issue (issue_id) and project (project_id) in
+        issues and projects, -1 if unknown.
+    """
+    wl_cols = ['user', 'date', '#hours']
+    if '#logs' in worklogs.columns:
+        wl_cols.append('#logs')
+    worklogs_calc = worklogs[wl_cols].copy()
+    worklogs_calc['issue_id'] = issues.index.get_indexer(worklogs['issue']).astype('int32')
+    issues_project_id = projects.index.get_indexer(issues['project'])
+    worklogs_calc['project_id'] = lookup(issues_project_id, worklogs_calc['issue_id'], -1).astype('int16')
+    
+    return worklogs_calc
+
+
+def extract_info(worklogs_calc):
+    """
+    Extracts general information from worklogs facts.
+
+    Parameters
+    ----------
+    worklogs_calc : pandas.DataFrame
+        Worklogs facts.
+
+    Returns
+    -------
+    info : pandas.Series
+        First and last day and number of logs, issues, projects and users.
+    """
+    info = {}
+    info['min_date'] = worklogs_calc['date'].min()
+    info['max_date'] = worklogs_calc['date'].max()
+    info['#logs'] = worklogs_calc['#logs'].sum() if '#logs' in worklogs_calc.columns else worklogs_calc.shape[0]
+    info['#issues'] = worklogs_calc.loc[worklogs_calc['issue_id'] >= 0, 'issue_id'].nunique()
+    info['#projects'] = worklogs_calc.loc[worklogs_calc['project_id'] >= 0, 'project_id'].nunique()
+    info['#users'] = worklogs_calc['user'].nunique()
+    info = pd.Series(info) 
+    
+    return info
+
+
+def extend_worklogs(worklogs_calc, issues, projects):
+    """
+    Builds the wide view of the worklogs facts, with the features of their
+    issue (issue_ prefix) and project (project_ prefix) in every worklog, to
+    analyze worklogs (e.g. in notebooks).
+
+    Parameters
+    ----------
+    worklogs_calc : pandas.DataFrame
+        Worklogs facts with the position of their issue (issue_id) and
+        project (project_id) in issues and projects.
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    projects : pandas.DataFrame
+        Projects features extracted from worklogs.
+
+    Returns
+    -------
+    worklogs : pandas.DataFrame
+        Worklogs (issue, user, date, #hours) with issues and projects 
+        features.
+
+    See Also
+    --------
+    calculate_worklogs, extract_facts
+    """
+    issue_id = worklogs_calc['issue_id'].values
+    project_id = worklogs_calc['project_id'].values
+    
+    worklogs = pd.DataFrame({'issue': lookup(issues.index, issue_id)}, index=worklogs_calc.index)
+    worklogs = worklogs.join(worklogs_calc.drop(['issue_id', 'project_id'], axis=1))
+    for col in issues.columns:
+        worklogs['issue_' + col] = lookup(issues[col], issue_id)
+    for col in projects.columns:
+        worklogs['project_' + col] = lookup(projects[col], project_id)
+    
+    return worklogs
+
+
+def calculate_users_metrics(worklogs_calc, issues, periods, absences=None, 
+                            min_hours=Calculate.USERS_MIN_YEARLY_HOURS, metrics=None, backend=None,
+                            partitions=None):
+    """
+    Calculates users features, metrics (KPIs) and performance in several
+    periods of time at once.
+
+    Parameters
+    ----------
+    worklogs_calc : pandas.DataFrame or list
+        Worklogs facts with the position of their issue (issue_id), or 
+        parquet files of the facts of every partition of dates.
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    periods : dict
+        Periods names as keys and lists containing two dates to define the
+        period of time as values.
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns).
+    min_hours : float
+        Minimum hours of employees in a period, ignored if less.
+    metrics : list or None (default)
+        KPIs to calculate, only computing the features they need. If None,
+        all of them are calculated.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+    partitions : str or None (default)
+        Period of the partitions of dates (pandas period alias, e.g. M) to
+        calculate users features by partition of the worklogs facts dataset.
+        If None, it is a single partition.
+
+    Returns
+    -------
+    users_and_metrics : pandas.DataFrame
+        Features, metrics (KPIs) absolute value and standarized, aggregated
+        metrics and final metric by period and employee (index).
+
+    See Also
+    --------
+    calculate_users_periods, calculate_metrics, calculate_performance
+    """
+    # features needed by the metrics
+    features = None
+    if metrics is not None:
+        metrics_features = get_metrics_features()
+        features = [feature for metric in metrics for feature in metrics_features[metric]]
+    # compute data for all the periods at once
+    users_calc = calculate_users_periods(worklogs_calc, issues, periods, absences, min_hours, 
+                                         features, backend, partitions)
+    # obtain metrics
+    metrics = calculate_metrics(users_calc, metrics)
+    # obtain metrics by dimension and final performance, by period
+    performance = calculate_performance(metrics)
+    
+    return users_calc.join(metrics).join(performance, rsuffix='_std')
+
+
+def calculate_users_interval(worklogs_calc, issues, interval=None, absences=None):
+    """
+    Calculates users features in a particular period of time.
+
+    Parameters
+    ----------
+    worklogs_calc : pandas.DataFrame
+        Worklogs facts with the position of their issue (issue_id).
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    interval : list or None (default)
+        List containing two dates to define the period of time. If None,
+        the complete available period is considered.
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns), not counted as
+        expected working days.
+
+    Returns
+    -------
+    users : pandas.DataFrame
+        Large set of features extracted from worklogs by employee (index).
+
+    See Also
+    --------
+    calculate_users_periods
+    """
+    users = calculate_users_periods(worklogs_calc, issues, {'interval': interval}, absences)
+    
+    return split_periods(users, ['interval'])['interval']
+
+
+def calculate_users_periods(worklogs_calc, issues, periods, absences=None, 
+                            min_hours=Calculate.USERS_MIN_YEARLY_HOURS, features=None, backend=None,
+                            partitions=None):
+    """
+    Calculates users features in several periods of time at once, grouping
+    worklogs by period and user. The partial aggregates of every partition
+    of dates are merged, so the intermediate data by period (worklogs and 
+    cube of hours) is held for a single partition at a time.
+
+    Parameters
+    ----------
+    worklogs_calc : pandas.DataFrame or list
+        Worklogs facts with the position of their issue (issue_id), or 
+        parquet files of the facts of every partition of dates, read one at
+        a time (from calculate_worklogs_partitioned).
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    periods : dict
+        Periods names as keys and lists containing two dates to define the
+        period of time as values. If None, the complete available period is
+        considered.
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns), not counted as
+        expected working days.
+    min_hours : float
+        Minimum hours of employees in a period, ignored if less 
+        (USERS_MIN_YEARLY_HOURS by default).
+    features : list or None (default)
+        Users features needed. Only the blocks of calculation (sources) 
+        obtaining them are computed, so other features can be missing. If
+        None, all the features are calculated.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+    partitions : str or None (default)
+        Period of the partitions of dates (pandas period alias, e.g. M) of
+        the worklogs facts dataset. If None, it is a single partition.
+
+    Returns
+    -------
+    users : pandas.DataFrame
+        Large set of features extracted from worklogs by period and employee
+        (index). Hours by project or issue type not found in the period are
+        missing (NaN).
+
+    See Also
+    --------
+    extract_users_partial, merge_users_partials, split_periods, 
+    calculate_capacity, get_features_sources, conventions
+    """
+    sources = get_features_sources(features)
+
+    # intervals
+    if isinstance(worklogs_calc, pd.DataFrame):
+        worklogs_interval = [worklogs_calc['date'].min(), worklogs_calc['date'].max()]
+    else:
+        dates = [pd.read_parquet(file, columns=['date'])['date'] for file in worklogs_calc]
+        worklogs_interval = [min(date.min() for date in dates), max(date.max() for date in dates)]
+    intervals = []
+    for interval in periods.values():
+        if interval is None:
+            interval = worklogs_interval
+        else:
+            interval = pd.to_datetime(interval)
+            interval = [max(worklogs_interval[0], interval[0]), 
+                        min(worklogs_interval[1], interval[1])]
+        intervals.append(interval)
+    # partial aggregates, of every partition of dates or of all the worklogs
+    if not isinstance(worklogs_calc, pd.DataFrame):
+        parts = (pd.read_parquet(file) for file in worklogs_calc)
+    elif partitions is None:
+        parts = [worklogs_calc]
+    else:
+        parts = (part for _, part in worklogs_calc.groupby(worklogs_calc['date'].dt.to_period(partitions)))
+    partials = [extract_users_partial(part, issues, intervals, sources, backend) for part in parts]
+    users = merge_users_partials(partials, issues, intervals, absences, min_hours, sources, backend)
+
+    names = users.index.levels[0].map(dict(enumerate(periods)))
+    users.index = users.index.set_levels(names, level='period')
+    
+    return users
+
+
+def extract_users_partial(worklogs_calc, issues, intervals, sources, backend=None):
+    """
+    Extracts the partial aggregates of users features from a part of the
+    worklogs facts (e.g. a partition of dates), by period and user or by
+    date, to be merged with the partial aggregates of the rest of parts.
+
+    Parameters
+    ----------
+    worklogs_calc : pandas.DataFrame
+        Part of the worklogs facts with the position of their issue 
+        (issue_id).
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    intervals : list
+        Lists containing the first and last dates of every period.
+    sources : set
+        Blocks of calculation of the users features needed.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+
+    Returns
+    -------
+    partial : dict
+        Partial aggregates (pandas.DataFrame) by name: sums, minimum and 
+        maximum dates by period and user (users); distinct issues and helped
+        users by period and user (issues, helped_users); hours by period, 
+        user and date, issue, project or issue type (users_dates, 
+        issues_periods, projects, types); hours and logs by date (dates, 
+        users_logs, projects_logs, projects_dates, types_logs).
+
+    See Also
+    --------
+    merge_users_partials, calculate_users_periods
+    """
+    # filter dates, by segment of time
+    bounds, members = split_segments(intervals)
+    segment = bounds.searchsorted(worklogs_calc['date'].values, side='right') - 1
+    in_periods = np.isin(segment, np.concatenate(members))
+    worklogs_calc = worklogs_calc[in_periods].assign(segment=segment[in_periods])
+    # leaders helped by the user
+    if 'counts' in sources:
+        leaders = pd.Categorical(issues['leader'], dtype=worklogs_calc['user'].dtype)
+        leader = pd.Series(lookup(leaders, worklogs_calc['issue_id'].values), index=worklogs_calc.index)
+        collaborated = (worklogs_calc['user'] != leader) & ~leader.isna()
+        worklogs_calc['helped_user'] = leader.where(collaborated)
+    # hours by day, user and issues features, with the kinds of time
+    cube = build_worklogs_cube(worklogs_calc, issues, backend=backend)
+    cube = cube.join(calculate_times(cube))
+    cube['segment'] = bounds.searchsorted(cube['date'].values, side='right') - 1
+    
+    # users, in a single aggregation of the cube by segment and user
+    partial = {}
+    users_plan = {'#hours': ('#hours', 'sum')}
+    users_plan.update({col: (col, 'sum') for col in cube.columns if col.endswith('_time')})
+    users_plan['min_date'] = ('date', 'min')
+    users_plan['max_date'] = ('date', 'max')
+    users_plan['#logs'] = ('#logs', 'sum')
+    if 'capacity' in sources:
+        users_plan['#days'] = ('date', 'nunique')
+    partial['users'] = aggregate(cube, ['segment', 'user'], users_plan, backend=backend)
+    # distinct issues and helped users
+    if 'counts' in sources:
+        partial['issues'] = worklogs_calc[['segment', 'user', 'issue_id']].drop_duplicates()
+        partial['helped_users'] = worklogs_calc[['segment', 'user', 'helped_user']].dropna().drop_duplicates()
+    # hours by segment and issue, or user and project or issue type
+    hours_plan = {'#hours': ('#hours', 'sum')}
+    if sources & {'leading', 'leading_closed', 'reporting'}:
+        issues_segments = worklogs_calc[worklogs_calc['issue_id'] >= 0]
+        partial['issues_periods'] = aggregate(issues_segments, ['segment', 'issue_id'], hours_plan, 
+                                              backend=backend)
+    if 'projects' in sources:
+        partial['projects'] = aggregate(cube, ['segment', 'user', 'project'], hours_plan, backend=backend)
+    if 'types' in sources:
+        partial['types'] = aggregate(cube, ['segment', 'user', 'type'], hours_plan, backend=backend)
+    
+    # hours and logs by date (the same in any period including the date)
+    dates = cube[['date', '#hours']].copy()
+    if 'reporting' in sources:
+        dates['reported'] = cube['#hours'].where(cube['is_reported'], 0)
+    if 'types' in sources:
+        dates['bug_time'] = cube['bug_time']
+    partial['dates'] = aggregate(dates, 'date', {col: (col, 'sum') for col in dates.columns.drop('date')}, 
+                                 backend=backend)
+    logs_plan = {'#logs': ('date', 'size')}
+    if 'users_total' in sources:
+        partial['users_logs'] = aggregate(cube, ['date', 'user'], logs_plan, backend=backend)
+    if 'projects' in sources:
+        partial['projects_logs'] = aggregate(cube, ['date', 'project'], logs_plan, backend=backend)
+        partial['projects_dates'] = aggregate(cube, ['date', 'project'], hours_plan, backend=backend)
+    if 'types' in sources:
+        partial['types_logs'] = aggregate(cube, ['date', 'type'], logs_plan, backend=backend)
+        
+    return partial
+
+
+def merge_users_partials(partials, issues, intervals, absences=None, 
+                         min_hours=Calculate.USERS_MIN_YEARLY_HOURS, sources=None, backend=None):
+    """
+    Merges the partial aggregates of users features of several parts of
+    worklogs facts and calculates the users features from them.
+
+    Parameters
+    ----------
+    partials : list
+        Partial aggregates from extract_users_partial.
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    intervals : list
+        Lists containing the first and last dates of every period.
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns).
+    min_hours : float
+        Minimum hours of employees in a period, ignored if less.
+    sources : set or None (default)
+        Blocks of calculation of the users features needed. If None, all
+        the features are calculated.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+
+    Returns
+    -------
+    users : pandas.DataFrame
+        Users features by period (position) and employee (index).
+
+    See Also
+    --------
+    extract_users_partial, calculate_users_periods, merge_aggregates
+    """
+    sources = get_features_sources() if sources is None else sources
+    partial = {}
+    for name in partials[0]:
+        parts = [p[name] for p in partials]
+        if name in ('issues', 'helped_users'):
+            partial[name] = parts[0] if len(parts) == 1 else pd.concat(parts).drop_duplicates()
+        else:
+            functions = {'min_date': 'min', 'max_date': 'max'} if name == 'users' else None
+            partial[name] = merge_aggregates(parts, functions, backend)
+    # from segments of time to the periods made of them
+    _, members = split_segments(intervals)
+    for name in ('users', 'issues', 'helped_users', 'issues_periods', 'projects', 'types'):
+        if name not in partial:
+            continue
+        if name in ('issues', 'helped_users'):
+            partial[name] = expand_periods(partial[name], members).drop_duplicates()
+        else:
+            by_segment = partial[name]
+            by = ['period'] + [key for key in by_segment.index.names if key != 'segment']
+            plan = {col: (col, {'min_date': 'min', 'max_date': 'max'}.get(col, 'sum')) 
+                    for col in by_segment.columns}
+            partial[name] = aggregate(expand_periods(by_segment.reset_index(), members), by, plan, 
+                                      backend=backend)
+    ends = np.array([interval[1] for interval in intervals], dtype='datetime64[ns]')
+    # issues leaders and reporters as users, by issue position
+    users = partial['users']
+    leaders = pd.Categorical(issues['leader'], dtype=users.index.get_level_values('user').dtype)
+    reporters = pd.Categorical(issues['reporter'].astype(object), dtype=users.index.get_level_values('user').dtype)
+    
+    # distinct counts
+    if 'counts' in sources:
+        for name in ('issues', 'helped_users'):
+            counts = aggregate(partial[name], ['period', 'user'], {'#' + name: ('period', 'size')}, 
+                               backend=backend)
+            users['#' + name] = counts['#' + name].reindex(users.index, fill_value=0)
+    # ignore if #hours is too small
+    users = users[users['#hours'] >= min_hours]
+
+    if 'capacity' in sources:
+        # hours per user and day
+        users['#daily_hours'] = (users['#hours'] / users.pop('#days')).round(0).clip(upper=8)
+        # user duration in logs
+        users['duration'] = (users['max_date'] - users['min_date']).dt.days + 1
+
+        # expected working hours in period
+        users['#hours_total'] = calculate_capacity(users, absences) * users['#daily_hours']
+
+    if sources & {'leading', 'leading_closed', 'reporting'}:
+        # issues in the periods
+        issues_periods = partial['issues_periods'].copy()
+        issue_id = issues_periods.index.get_level_values('issue_id').values
+        issues_periods['leader'] = lookup(leaders, issue_id)
+        issues_periods['reporter'] = lookup(reporters, issue_id)
+        issues_periods['duration'] = lookup(issues['duration'], issue_id)
+        period_end = ends[issues_periods.index.get_level_values('period').values]
+        issues_periods['is_closed'] = lookup(issues['max_date'], issue_id) <= period_end
+        leading_plan = {'volume': ('#hours', 'sum'), 
+                        'issues': ('#hours', 'size'),
+                        'duration': ('duration', 'mean')}
+
+    if 'leading' in sources:
+        # leading issues
+        leading = issues_periods.groupby(['period', 'leader'], observed=True).agg(**leading_plan)
+        leading = leading.rename_axis(['period', 'user'])
+        # leading issues time
+        users['leading_volume'] = leading['volume'].reindex(users.index)
+        # needed help in leading issues
+        users['helped_time'] = users['leading_volume'] - users['leading_time']
+        # number of leading issues
+        users['#leading_issues'] = leading['issues'].reindex(users.index)
+        # duration of leading issues
+        users['leading_duration'] = leading['duration'].reindex(users.index) * users['#daily_hours'] / 8
+
+    if 'leading_closed' in sources:
+        # leading closed issues
+        leading_closed = issues_periods[issues_periods['is_closed']]
+        leading_closed = leading_closed.groupby(['period', 'leader'], observed=True).agg(**leading_plan)
+        leading_closed = leading_closed.rename_axis(['period', 'user'])
+        # leading closed issues time
+        users['leading_closed_volume'] = leading_closed['volume'].reindex(users.index)
+        # number of leading closed issues
+        users['#leading_closed_issues'] = leading_closed['issues'].reindex(users.index)
+        # duration of leading closed issues
+        users['leading_closed_duration'] = leading_closed['duration'].reindex(users.index) * users['#daily_hours'] / 8
+
+    # period by user to properly compute share calculations, as windows of
+    # sorted dates to aggregate cumulative sums by date (the same in any 
+    # period including the date)
+    dates = partial['dates']
+    days = pd.DatetimeIndex(dates.index)
+    start = days.searchsorted(users['min_date'].values, side='left')
+    end = days.searchsorted(users['max_date'].values, side='right')
+    
+    if 'reporting' in sources:
+        # user as reporter
+        reporting = issues_periods.groupby(['period', 'reporter'], observed=True)['#hours'].sum()
+        reporting = reporting.rename_axis(['period', 'user'])
+        # issues time as reporter
+        users['reporting_volume'] = reporting.reindex(users.index).fillna(0)
+        # share as reporter
+        users['reporting_total_interval'] = windows_sum(dates['reported'], start, end)
+        users['%reporting_volume'] = users['reporting_volume'] / users['reporting_total_interval']
+
+    # number of helped users
+    if 'counts' in sources:
+        users['#helped_users'] = users.pop('#helped_users')
+    if 'users_total' in sources:
+        logs_by_date = count_by_date(partial['users_logs'], days)
+        users['#users_total_interval'] = (windows_sum(logs_by_date, start, end) > 0).sum(axis=1)
+
+    if 'projects' in sources:
+        # users by project
+        users_by_project = hours_by_period(partial['projects'], users.index)
+        # dedication to projects std (in user interval)    
+        logs_by_project = count_by_date(partial['projects_logs'], days)[users_by_project.columns]
+        projects_interval = windows_sum(logs_by_project, start, end) > 0
+        users['projects_std'] = users_by_project.where(projects_interval).std(axis=1)
+        users['projects_std'] = users['projects_std'] / users['#hours']
+        # shared by project (in user interval)
+        dates_by_project = partial['projects_dates']['#hours'].unstack()
+        dates_by_project = dates_by_project.reindex(index=days, columns=users_by_project.columns).fillna(0)
+        project_contribution = users_by_project / windows_sum(dates_by_project, start, end)
+        users['#leading_projects'] = (project_contribution > Calculate.PROJECTS_LEADER_SHARE_LIMIT).sum(axis=1)
+        users['%leading_projects'] = users['#leading_projects'] / projects_interval.sum(axis=1)
+        # dedication to projects
+        rename_by_project = {col: 'project_' + col + '_time' for col in users_by_project.columns}
+        users_by_project = users_by_project.rename(rename_by_project, axis=1)
+        users = users.join(users_by_project)
+
+    if 'types' in sources:
+        # users by issue type
+        users_by_type = hours_by_period(partial['types'], users.index)
+        # dedication to issues types std (in user interval)
+        logs_by_type = count_by_date(partial['types_logs'], days)[users_by_type.columns]
+        types_interval = windows_sum(logs_by_type, start, end) > 0
+        users['types_std'] = users_by_type.where(types_interval).std(axis=1)
+        users['types_std'] = users['types_std'] / users['#hours']
+        # share of bugs
+        users['bugs_total_interval'] = windows_sum(dates['bug_time'], start, end)
+        users['%bug_time'] = users['bug_time'] / users['bugs_total_interval']
+        # dedication to issues types
+        rename_by_type = {col: 'type_' + col + '_time' for col in users_by_type.columns}
+        users_by_type = users_by_type.rename(rename_by_type, axis=1)
+        users = users.join(users_by_type)
+    
+    return users
+
+
+def split_segments(intervals):
+    """
+    Splits the time in segments by the first and last dates of the periods,
+    so that every period is made of consecutive segments and the data can 
+    be aggregated once by segment instead of once by period.
+
+    Parameters
+    ----------
+    intervals : list
+        Lists containing the first and last dates of every period.
+
+    Returns
+    -------
+    bounds : pandas.DatetimeIndex
+        First day of every segment, sorted, and the day after the last one.
+    members : list
+        Arrays of the segments (positions) of every period.
+    """
+    bounds = {date for start, end in intervals for date in (start, end + pd.Timedelta(days=1))}
+    bounds = pd.DatetimeIndex(sorted(bounds))
+    members = [np.flatnonzero((bounds[:-1] >= start) & (bounds[:-1] <= end)) for start, end in intervals]
+    
+    return bounds, members
+
+
+def expand_periods(data, members):
+    """
+    Assigns rows of data by segment of time to the periods made of their
+    segment, as rows by period.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Data including segment.
+    members : list
+        Arrays of the segments (positions) of every period.
+
+    Returns
+    -------
+    data : pandas.DataFrame
+        Data including period (position) instead of segment.
+
+    See Also
+    --------
+    split_segments
+    """
+    segment = data['segment'].values
+    data = data.drop(columns='segment')
+    
+    return pd.concat([data[np.isin(segment, segments)].assign(period=i) 
+                      for i, segments in enumerate(members)], ignore_index=True)
+
+
+def merge_aggregates(aggregates, functions=None, backend=None):
+    """
+    Merges aggregates of several parts of data by the same groups, summing
+    their columns (sums or counts) unless other function is set (e.g. min
+    of minimums).
+
+    Parameters
+    ----------
+    aggregates : list
+        Aggregated columns by group (index) of every part.
+    functions : dict or None (default)
+        Columns as keys and functions (e.g. min or max) to merge them as
+        values, sum if not found.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+
+    Returns
+    -------
+    aggregated : pandas.DataFrame
+        Merged columns by group (index), sorted by group.
+
+    See Also
+    --------
+    aggregate
+    """
+    if len(aggregates) == 1:
+        return aggregates[0]
+    functions = {} if functions is None else functions
+    by = list(aggregates[0].index.names)
+    data = pd.concat([aggregated.reset_index() for aggregated in aggregates], ignore_index=True)
+    plan = {col: (col, functions.get(col, 'sum')) for col in aggregates[0].columns}
+    
+    return aggregate(data, by, plan, backend=backend)
+
+
+def hours_by_period(hours, index):
+    """
+    Hours by period, user and value of a column, as zero if the value is
+    found in the period and missing (NaN) if not.
+
+    Parameters
+    ----------
+    hours : pandas.DataFrame
+        Hours (#hours) by period, user and value of a column (index).
+    index : pandas.MultiIndex
+        Periods and users of the result.
+
+    Returns
+    -------
+    hours : pandas.DataFrame
+        Hours by period and user (index) and value (columns).
+    """
+    hours = hours['#hours']
+    column = hours.index.names[-1]
+    found = hours.groupby(level=['period', column], observed=True).size().unstack().notna()
+    hours = hours.unstack().reindex(index)
+    found = found.reindex(index=index.get_level_values('period'), columns=hours.columns, fill_value=False)
+    
+    return hours.fillna(0).where(found.values)
+
+
+def split_periods(users, periods):
+    """
+    Splits users features by period, dropping the hours by project or issue
+    type not found in the period.
+
+    Parameters
+    ----------
+    users : pandas.DataFrame
+        Features by period and employee (index).
+    periods : list
+        Periods names.
+
+    Returns
+    -------
+    users : dict
+        Dictionary of pandas.DataFrame, periods as keys, containing the
+        features by employee (index).
+    """
+    split = {}
+    for period in periods:
+        if period in users.index.get_level_values('period'):
+            data = users.xs(period, level='period')
+        else:
+            data = users.iloc[:0].droplevel('period')
+        by_value = [col for col in data.columns 
+                    if (col.startswith('project_') or col.startswith('type_')) and col.endswith('_time')]
+        not_found = data[by_value].columns[data[by_value].isna().all()]
+        split[period] = data.drop(not_found, axis=1)
+        
+    return split
 
 
-def calculate_worklogs(worklogs):
+def calculate_capacity(users, absences=None):
     """
-    Adds useful features to worklogs non depending on time period.
+    Counts the expected working days of users between their first and last
+    day, excluding weekends, holidays of their calendar and absences.
 
     Parameters
     ----------
-    worklogs : pandas.DataFrame
-        Preprocessed worklogs.
+    users : pandas.DataFrame
+        Users (index or user index level) including min_date and max_date.
+    absences : pandas.DataFrame or None (default)
+        Absence days of employees (user and date columns).
 
     Returns
     -------
-    worklogs_calc : pandas.DataFrame
-        Preprocessed worklogs including new calculated features from issues
-        and projects.
-    issues : pandas.DataFrame
-        Issues features extracted from worklogs.
-    projects : pandas.DataFrame
-        Projects features extracted from worklogs.
-    info : pandas.Series
-        General information from the dataset.
+    days : numpy.ndarray
+        Number of working days by user.
 
     See Also
     --------
-    extract_issues, extract_projects, conventions.py
-    """
-    issues = extract_issues(worklogs)
-    
-    projects = extract_projects(worklogs, issues)
-
-    # issues & projects in worklogs
-    wl_cols = ['issue', 'user', 'date', '#hours']
-    worklogs_calc = worklogs[wl_cols]
-    issues_rename = {x: 'issue_' + x for x in issues.columns}
-    add = issues.rename(issues_rename, axis=1)
-    worklogs_calc = worklogs_calc.merge(add,
-                                        right_on='issue',
-                                        left_on='issue',
-                                        how='left')
-    projects_rename = {x: 'project_' + x for x in projects.columns}
-    add = projects.rename(projects_rename, axis=1)
-    worklogs_calc = worklogs_calc.merge(add,
-                                        right_on='project',
-                                        left_on='issue_project',
-                                        how='left')
-    
-    # new features for metrics calculation
-    worklogs_calc['bug_time'] = worklogs_calc['#hours'] * worklogs_calc['issue_is_bug']
-    worklogs_calc['learning_time'] = worklogs_calc['#hours'] * worklogs_calc['issue_is_learning']
-    worklogs_calc['meeting_time'] = worklogs_calc['#hours'] * worklogs_calc['issue_is_meeting']
-    worklogs_calc['managing_time'] = worklogs_calc['#hours'] * worklogs_calc['issue_is_management']
-    worklogs_calc['collaboration_time'] = worklogs_calc['#hours'] * (
-        (worklogs_calc['user'] != worklogs_calc['issue_leader']
-        ) & ~worklogs_calc['issue_leader'].isna())
-    worklogs_calc['participation_time'] = worklogs_calc['#hours'] * worklogs_calc['issue_leader'].isna()
-    worklogs_calc['leading_time'] = worklogs_calc['#hours'] * (worklogs_calc['user'] == worklogs_calc['issue_leader'])
+    conventions.py
+    """
+    min_dates = users['min_date'].values.astype('datetime64[D]')
+    max_dates = users['max_date'].values.astype('datetime64[D]') + 1
+    names = users.index.get_level_values('user').astype(object)
+    calendars = np.array([Calculate.CAPACITY_USERS_CALENDAR.get(user, Calculate.CAPACITY_DEFAULT_CALENDAR)
+                          for user in names])
     
-    info = {}
-    info['min_date'] = worklogs_calc['date'].min()
-    info['max_date'] = worklogs_calc['date'].max()
-    info['#logs'] = worklogs_calc.shape[0]
-    info['#issues'] = worklogs_calc['issue'].nunique()
-    info['#projects'] = worklogs_calc['issue_project'].nunique()
-    info['#users'] = worklogs_calc['user'].nunique()
-    info = pd.Series(info) 
-    print('------- Worklogs -------')
-    print(info)
-
-    return worklogs_calc, issues, projects, info
+    days = np.zeros(len(users), dtype=int)
+    for calendar in np.unique(calendars):
+        holidays = Calculate.CAPACITY_HOLIDAYS.get(calendar, [])
+        mask = calendars == calendar
+        days[mask] = np.busday_count(min_dates[mask], max_dates[mask], 
+                                     weekmask=Calculate.CAPACITY_WEEKMASK, holidays=holidays)
+        
+    if absences is not None:
+        absences = absences[['user', 'date']].drop_duplicates().astype({'user': object})
+        absences = pd.DataFrame({'user': names, 'row': np.arange(len(users))}).merge(absences, on='user')
+        position = absences['row'].values
+        dates = pd.to_datetime(absences['date']).values.astype('datetime64[D]')
+        absent = np.zeros(len(dates), dtype=bool)
+        for calendar in np.unique(calendars):
+            holidays = Calculate.CAPACITY_HOLIDAYS.get(calendar, [])
+            mask = calendars[position] == calendar
+            absent[mask] = np.is_busday(dates[mask], weekmask=Calculate.CAPACITY_WEEKMASK, holidays=holidays)
+        absent &= (dates >= min_dates[position]) & (dates < max_dates[position])
+        days = days - np.bincount(position[absent], minlength=len(users))
+        
+    return days
 
 
-def calculate_users_interval(worklogs_calc, interval=None):
+def count_by_date(counts, days):
     """
-    Calculates users features in a particular period of time.
+    Number of worklogs by date and value of a column, zero if not found.
 
     Parameters
     ----------
-    worklogs_calc : pandas.DataFrame
-        Preprocessed worklogs including issues and projects features.
-    interval : list or None (default)
-        List containing two dates to define the period of time. If None,
-        the complete available period is considered.
+    counts : pandas.DataFrame
+        Number of worklogs (#logs) by date and value of a column (index).
+    days : pandas.DatetimeIndex
+        Sorted dates of the result.
 
     Returns
     -------
-    users : pandas.DataFrame
-        Large set of features extracted from worklogs by employee (index).
+    counts : pandas.DataFrame
+        Number of worklogs by date (index) and value (columns).
+    """
+    counts = counts['#logs'].unstack(fill_value=0)
+    
+    return counts.reindex(days, fill_value=0)
 
-    See Also
-    --------
-    conventions
+
+def windows_sum(by_date, start, end):
     """
+    Sums data by date in windows of positions [start, end) as differences of
+    cumulative sums, so that each window costs the same regardless of its
+    length.
 
-    # interval 
-    worklogs_interval = [worklogs_calc['date'].min(), worklogs_calc['date'].max()]
-    if interval is None:
-        interval = worklogs_interval
-    else:
-        interval = pd.to_datetime(interval)
-        interval = [max(worklogs_interval[0], interval[0]), 
-                    min(worklogs_interval[1], interval[1])]
-    # filter dates
-    worklogs_calc = worklogs_calc[(worklogs_calc['date'] >= interval[0]) &
-                                  (worklogs_calc['date'] <= interval[1])]
-    # set issues status
-    worklogs_calc['issue_is_closed'] = worklogs_calc['issue_max_date'] <= interval[1]
-    
-    # extract users
-    userscols = [x for x in worklogs_calc.columns
-                 if 'issue' not in x and 'project_' not in x and x not in ['user', 'date']]
-    group_user = worklogs_calc.groupby(['user'])
-    users = group_user.sum()[userscols]
-    # first day
-    users['min_date'] = group_user.min()['date']
-    # last day
-    users['max_date'] = group_user.max()['date']
-    # number of logs
-    users['#logs'] = group_user.count()['#hours']
-    # number of issues
-    users['#issues'] = group_user.nunique()['issue']
-
-    # user by date
-    users_by_date = pd.pivot_table(worklogs_calc, 
-                                   values='#hours',
-                                   index=['user'],
-                                   columns=['date'],
-                                   aggfunc=np.sum) 
-    # hours per user and day
-    users['#daily_hours'] = users_by_date.mean(axis=1).round(0).clip(upper=8)
-    # user duration in logs
-    users['duration'] = (users['max_date'] - users['min_date']).dt.days + 1
-
-    # expected working hours in period
-    days = pd.bdate_range(start=interval[0], end=interval[1])
-    days = pd.Series(1, index=days)
-    users['#hours_total'] = [len(days.loc[users.loc[x, 'min_date']:users.loc[x, 'max_date']])
-                             for x in users.index]
-    users['#hours_total'] = users['#hours_total'] * users['#daily_hours']
-
-    # leading issues
-    group_issue_leader = worklogs_calc.groupby(['issue_leader'])
-    group_issue_leader_issue = worklogs_calc.groupby(['issue_leader', 'issue']).last().groupby('issue_leader')
-    # leading issues time
-    users['leading_volume'] = group_issue_leader.sum()['#hours'].fillna(0)
-    # needed help in leading issues
-    users['helped_time'] = users['leading_volume'] - users['leading_time']
-    # number of leading issues
-    users['#leading_issues'] = group_issue_leader.nunique()['issue']
-    # duration of leading issues
-    users['leading_duration'] = group_issue_leader_issue.mean()['issue_duration'] * users['#daily_hours'] / 8
-    
-    # leading closed issues
-    closed_issues = worklogs_calc[worklogs_calc['issue_is_closed']].index
-    group_issue_leader_closed = worklogs_calc.loc[closed_issues].groupby(['issue_leader'])
-    group_issue_leader_issue_closed = worklogs_calc.loc[closed_issues].groupby(['issue_leader', 'issue']).last().groupby('issue_leader')
-    # leading closed issues time
-    users['leading_closed_volume'] = group_issue_leader_closed.sum()['#hours'].fillna(0)
-    # number of leading closed issues
-    users['#leading_closed_issues'] = group_issue_leader_closed.nunique()['issue']
-    # duration of leading closed issues
-    users['leading_closed_duration'] = group_issue_leader_issue_closed.mean()['issue_duration'] * users['#daily_hours'] / 8
-    
-    # period by user to properly compute share calculations
-    users_interval = [worklogs_calc[(worklogs_calc['date'] >= users.loc[user, 'min_date']) & 
-                                (worklogs_calc['date'] <= users.loc[user, 'max_date'])].index 
-                      for user in users.index]    
-    
-    # user as reporter
-    reporting = worklogs_calc.groupby('issue_reporter').sum()['#hours']
-    reporting = reporting.rename('reporting')
-    # issues time as reporter
-    users['reporting_volume'] = users.join(reporting)['reporting'].fillna(0)
-    # share as reporter
-    users['reporting_total_interval'] = [worklogs_calc.loc[x][~worklogs_calc.loc[x]['issue_reporter'].isna()]['#hours'].sum() 
-                                         for x in users_interval]
-    users['%reporting_volume'] = users['reporting_volume'] / users['reporting_total_interval']
+    Parameters
+    ----------
+    by_date : pandas.Series or pandas.DataFrame
+        Data by sorted dates (index).
+    start : numpy.ndarray
+        First position of each window.
+    end : numpy.ndarray
+        Position after the last one of each window.
 
-    # number of helped users
-    collaborated = (worklogs_calc['user'] != worklogs_calc['issue_leader']) & ~worklogs_calc['issue_leader'].isna()
-    users['#helped_users'] = worklogs_calc[collaborated][['user', 'issue_leader']].groupby('user').nunique()
-    users['#helped_users'] = users['#helped_users'].fillna(0)
-    users['#users_total_interval'] = [worklogs_calc.loc[x]['user'].nunique() for x in users_interval]
-
-    # users by project
-    users_by_project = pd.pivot_table(worklogs_calc, 
-                                      values='#hours', 
-                                      index=['user'], 
-                                      columns=['issue_project'], 
-                                      aggfunc=np.sum)
-    users_by_project = users_by_project.fillna(0)
-    # dedication to projects std (in user interval)    
-    projects_interval = [list(set(worklogs_calc.loc[x]['issue_project'].values)) for x in users_interval]
-    users['projects_std'] = [users_by_project.loc[user, projects_interval[i]].std()  
-                             for i, user in enumerate(users_by_project.index)]
-    users['projects_std'] = users['projects_std'] / users['#hours']
-    # shared by project (in user interval)
-    dates_interval = [list(set(worklogs_calc.loc[x, 'date'])) for x in users_interval] 
-    dates_by_project = pd.pivot_table(worklogs_calc, 
-                                      values='#hours', 
-                                      index=['date'], 
-                                      columns=['issue_project'], 
-                                      aggfunc=np.sum)
-    project_contribution =  [users_by_project.loc[user] / dates_by_project.loc[dates].sum()
-                             for user, dates in zip(users.index, dates_interval)]    
-    users['#leading_projects'] = [(x > Calculate.PROJECTS_LEADER_SHARE_LIMIT).sum() for x in project_contribution]
-    users['#leading_projects'] = users['#leading_projects'].fillna(0)
-    users['%leading_projects'] = [users.loc[user, '#leading_projects'] / len(projects_interval[i])
-                                  for i, user in enumerate(users.index)]    
-    # dedication to projects
-    rename_by_project = {col: 'project_' + col + '_time' for col in users_by_project.columns}
-    users_by_project = users_by_project.rename(rename_by_project, axis=1)
-    users_by_project = users_by_project
-    users = users.join(users_by_project)
-    
-    # users by issue type
-    users_by_type = pd.pivot_table(worklogs_calc, 
-                                   values='#hours', 
-                                   index=['user'], 
-                                   columns=['issue_type'], 
-                                   aggfunc=np.sum)
-    users_by_type = users_by_type.fillna(0)
-    # dedication to issues types std (in user interval)
-    types_interval = [list(set(worklogs_calc.loc[x]['issue_type'].values))
-                      for x in users_interval]
-    users['types_std'] = [users_by_type.loc[user, types_interval[i]].std()  
-                          for i, user in enumerate(users_by_type.index)]
-    users['types_std'] = users['types_std'] / users['#hours']
-    # share of bugs
-    users['bugs_total_interval'] = [worklogs_calc.loc[x]['bug_time'].sum()
-                                    for x in users_interval]
-    users['%bug_time'] = users['bug_time'] / users['bugs_total_interval']
-    # dedication to issues types
-    rename_by_type = {col: 'type_' + col + '_time' for col in users_by_type.columns}
-    users_by_type = users_by_type.rename(rename_by_type, axis=1)
-    users_by_type = users_by_type
-    users = users.join(users_by_type)    
-    
-    # ignore if #hours is too small
-    ignore = users[users['#hours'] < Calculate.USERS_MIN_YEARLY_HOURS].index
-    users = users.drop(ignore)
+    Returns
+    -------
+    sums : numpy.ndarray
+        Sums by window (rows) and column of by_date.
+    """
+    values = by_date.values
+    cumsum = np.zeros((values.shape[0] + 1,) + values.shape[1:])
+    cumsum[1:] = values.cumsum(axis=0)
     
-    return users
+    return cumsum[end] - cumsum[start]
 
 
-def calculate_metrics(users):
+def calculate_metrics(users, metrics=None):
     """
     Calculates employee performance metrics (KPIs).
 
@@ -310,6 +1646,8 @@ def calculate_metrics(users):
     ----------
     users : pandas.DataFrame
         Features extracted from worklogs by employee (index).
+    metrics : list or None (default)
+        KPIs to calculate. If None, all of them are calculated.
 
     Returns
     -------
@@ -317,54 +1655,33 @@ def calculate_metrics(users):
         KPIs derived from users by employee (index): velocity, concentration,
         engagement, independence, learning, versatility, heterogeneity,
         complexity, collaboration, sociability, participation, connection,
-        management, guidance, responsibility.
+        management, guidance, responsibility (only the requested ones).
 
     See Also
     --------
-    calculate_users_interval, calculate_performance
+    calculate_users_interval, calculate_performance, get_metrics_features
     """
-    velocity = users['#leading_closed_issues'] / (users['leading_closed_volume'] / 8)
-
-    concentration = 1 / users['leading_closed_duration']
-    
-    engagement = users['#hours'] / users['#hours_total'] 
+    formulas = {
+        'velocity': lambda: users['#leading_closed_issues'] / (users['leading_closed_volume'] / 8),
+        'concentration': lambda: 1 / users['leading_closed_duration'],
+        'engagement': lambda: users['#hours'] / users['#hours_total'],
+        'independence': lambda: users['leading_time'] / users['leading_volume'],
+        'learning': lambda: users['learning_time'] / users['#hours'],
+        'versatility': lambda: 1 - users['projects_std'],
+        'heterogeneity': lambda: 1 - users['types_std'],
+        'complexity': lambda: users['%bug_time'],
+        'collaboration': lambda: users['collaboration_time'] / users['#hours'],
+        'sociability': lambda: users['#helped_users'] / (users['#users_total_interval'] - 1),
+        'participation': lambda: users['participation_time'] / users['#hours'],
+        'connection': lambda: users['meeting_time'] / users['#hours'],
+        'management': lambda: users['managing_time'] / users['#hours'],
+        'guidance': lambda: users['%reporting_volume'],
+        'responsibility': lambda: users['%leading_projects'],
+    }
+    # only the requested metrics, in the conventional order
+    keys = [key for key in formulas if metrics is None or key in metrics]
     
-    independence = users['leading_time'] / users['leading_volume']
-    
-    learning = users['learning_time'] / users['#hours']
-    
-    versatility = 1 - users['projects_std']
-
-    heterogeneity = 1 - users['types_std'] 
-    
-    complexity = users['%bug_time']
-    
-    collaboration = users['collaboration_time'] / users['#hours']
-    
-    sociability = users['#helped_users']  / (users['#users_total_interval'] - 1)
-
-    participation = users['participation_time'] / users['#hours']
-
-    connection = users['meeting_time'] / users['#hours']
-
-    management = users['managing_time'] / users['#hours']
-
-    guidance = users['%reporting_volume']    
-
-    responsibility = users['%leading_projects']
-    
-    # metrics dataframe
-    metrics = [velocity, concentration, engagement, independence]
-    metrics += [learning, versatility, heterogeneity, complexity]
-    metrics += [collaboration, sociability, participation, connection]
-    metrics += [management, guidance, responsibility]
-    
-    keys = ['velocity', 'concentration', 'engagement', 'independence']
-    keys += ['learning', 'versatility', 'heterogeneity', 'complexity']
-    keys += ['collaboration', 'sociability', 'participation', 'connection']
-    keys += ['management', 'guidance', 'responsibility']
-    
-    metrics = pd.concat(metrics, axis=1, keys=keys)    
+    metrics = pd.concat([formulas[key]() for key in keys], axis=1, keys=keys)
     
     return metrics
 
@@ -399,6 +1716,96 @@ def get_metrics_dict(final=True):
     return metrics_dict
 
 
+def get_metrics_features():
+    """
+    Returns the users features needed by each KPI.
+
+    Returns
+    -------
+    metrics_features : dict
+        Keys are the KPIs and values the list of users features used to
+        calculate the KPI.
+
+    See Also
+    --------
+    calculate_metrics, get_features_sources
+    """
+    metrics_features = {'velocity': ['#leading_closed_issues', 'leading_closed_volume'],
+                        'concentration': ['leading_closed_duration'],
+                        'engagement': ['#hours', '#hours_total'],
+                        'independence': ['leading_time', 'leading_volume'],
+                        'learning': ['learning_time', '#hours'],
+                        'versatility': ['projects_std'],
+                        'heterogeneity': ['types_std'],
+                        'complexity': ['%bug_time'],
+                        'collaboration': ['collaboration_time', '#hours'],
+                        'sociability': ['#helped_users', '#users_total_interval'],
+                        'participation': ['participation_time', '#hours'],
+                        'connection': ['meeting_time', '#hours'],
+                        'management': ['managing_time', '#hours'],
+                        'guidance': ['%reporting_volume'],
+                        'responsibility': ['%leading_projects'],
+                       }
+    
+    return metrics_features
+
+
+def get_features_sources(features=None):
+    """
+    Returns the blocks of calculation of users features (sources) needed to
+    obtain the requested features, including the sources they depend on.
+
+    Parameters
+    ----------
+    features : list or None (default)
+        Users features to obtain. If None, all the sources are returned.
+
+    Returns
+    -------
+    sources : set
+        Names of the sources: users (hours, times, dates and logs, always
+        calculated), counts, capacity, leading, leading_closed, reporting,
+        users_total, projects and types.
+
+    See Also
+    --------
+    calculate_users_periods, get_metrics_features
+    """
+    features_sources = {'#issues': 'counts', '#helped_users': 'counts',
+                        '#daily_hours': 'capacity', 'duration': 'capacity', 
+                        '#hours_total': 'capacity',
+                        'leading_volume': 'leading', 'helped_time': 'leading',
+                        '#leading_issues': 'leading', 'leading_duration': 'leading',
+                        'leading_closed_volume': 'leading_closed', 
+                        '#leading_closed_issues': 'leading_closed',
+                        'leading_closed_duration': 'leading_closed',
+                        'reporting_volume': 'reporting', 
+                        'reporting_total_interval': 'reporting',
+                        '%reporting_volume': 'reporting',
+                        '#users_total_interval': 'users_total',
+                        'projects_std': 'projects', '#leading_projects': 'projects',
+                        '%leading_projects': 'projects',
+                        'types_std': 'types', 'bugs_total_interval': 'types', 
+                        '%bug_time': 'types'}
+    # sources using features of other sources
+    sources_requirements = {'leading': ['capacity'], 'leading_closed': ['capacity']}
+    
+    if features is None:
+        return {'users'} | set(features_sources.values())
+    sources = {'users'}
+    for feature in features:
+        if feature.startswith('project_'):
+            sources.add('projects')
+        elif feature.startswith('type_'):
+            sources.add('types')
+        elif feature in features_sources:
+            sources.add(features_sources[feature])
+    for source in list(sources):
+        sources.update(sources_requirements.get(source, []))
+    
+    return sources
+
+
 def calculate_performance(metrics, limit=Calculate.AGGREGATION_STD_LIMIT, weights=Calculate.AGGREGATION_WEIGHTS):
     """
     Calculates employee performance aggregated metrics (KPIs).
@@ -414,8 +1821,9 @@ def calculate_performance(metrics, limit=Calculate.AGGREGATION_STD_LIMIT, weight
     Returns
     -------
     metrics : pandas.DataFrame
-        Standardized input KPIs, aggregated KPIs by dimension and final
-        performance KPI (mean).
+        Standardized input KPIs (by period, if in index), aggregated KPIs by
+        dimension and final performance KPI (mean). Aggregated KPIs are only
+        included if all their KPIs are available.
 
     See Also
     --------
@@ -423,19 +1831,116 @@ def calculate_performance(metrics, limit=Calculate.AGGREGATION_STD_LIMIT, weight
     """
     metrics_dict = get_metrics_dict()
     
-    metrics = (metrics - metrics.mean()) / metrics.std()
+    # standardize by period, if any
+    periods = (metrics.index.get_level_values('period') if 'period' in metrics.index.names 
+               else np.zeros(len(metrics)))
+    group = metrics.groupby(periods)
+    metrics = (metrics - group.transform('mean')) / group.transform('std')
     metrics = metrics.clip(lower=-limit, upper=limit) 
     metrics = (metrics + limit) / (2 * limit)
     
-    perf = {category: metrics[cols].mean(axis=1) for category, cols in metrics_dict.items()}
-    perf = pd.DataFrame(perf)
-    weights = pd.Series(weights)
-    perf['performance'] = (perf * weights).sum(axis=1)
+    perf = {category: metrics[cols].mean(axis=1) for category, cols in metrics_dict.items()
+            if metrics.columns.isin(cols).sum() == len(cols)}
+    perf = pd.DataFrame(perf, index=metrics.index)
+    if len(perf.columns) == len(metrics_dict):
+        weights = pd.Series(weights)
+        perf['performance'] = (perf * weights).sum(axis=1)
     
     return pd.concat([metrics, perf], axis=1)
 
 
-def extract_issues(worklogs):
+def calculate_times(cube):
+    """
+    Calculates the hours by kind of time from the issues flags and the
+    leader role of the user.
+
+    Parameters
+    ----------
+    cube : pandas.DataFrame
+        Hours including the issues flags and leader role (role).
+
+    Returns
+    -------
+    times : pandas.DataFrame
+        Hours by kind of time (bug, learning, meeting, managing,
+        collaboration, participation and leading) for each row (index).
+
+    See Also
+    --------
+    build_worklogs_cube
+    """
+    hours = cube['#hours']
+    
+    times = pd.DataFrame(index=cube.index)
+    times['bug_time'] = hours * cube['is_bug']
+    times['learning_time'] = hours * cube['is_learning']
+    times['meeting_time'] = hours * cube['is_meeting']
+    times['managing_time'] = hours * cube['is_management']
+    times['collaboration_time'] = hours * (cube['role'] == 'collaboration')
+    times['participation_time'] = hours * (cube['role'] == 'participation')
+    times['leading_time'] = hours * (cube['role'] == 'leading')
+    
+    return times
+
+
+def build_worklogs_cube(worklogs_calc, issues, backend=None):
+    """
+    Builds the cube of hours and logs by day, user, project, issue type,
+    leader role of the user (leading, collaboration or participation if the
+    issue has no leader) and issues flags (is_bug, is_meeting, is_learning,
+    is_management, is_reported). It is the internal roll-up of a part of the
+    worklogs facts from which extract_users_partial computes the features
+    made of hours, instead of from every worklog.
+
+    Parameters
+    ----------
+    worklogs_calc : pandas.DataFrame
+        Worklogs facts with the position of their issue (issue_id).
+    issues : pandas.DataFrame
+        Issues features extracted from worklogs.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+
+    Returns
+    -------
+    cube : pandas.DataFrame
+        Hours (#hours) and number of logs (#logs) by the cube dimensions
+        (columns), one row by combination found in worklogs.
+
+    See Also
+    --------
+    extract_users_partial, calculate_times
+    """
+    issue_id = worklogs_calc['issue_id'].values
+    leader = lookup(pd.Categorical(issues['leader'], dtype=worklogs_calc['user'].dtype), issue_id)
+    roles = np.select([leader.isna(), worklogs_calc['user'].values == leader],
+                      ['participation', 'leading'], 'collaboration')
+    
+    dims = pd.DataFrame({'date': worklogs_calc['date'].values,
+                         'user': worklogs_calc['user'].values,
+                         'project': lookup(issues['project'], issue_id),
+                         'type': lookup(issues['type'], issue_id),
+                         'role': pd.Categorical(roles, categories=['collaboration', 'leading', 'participation']),
+                         'is_bug': lookup(issues['is_bug'], issue_id, False),
+                         'is_meeting': lookup(issues['is_meeting'], issue_id, False),
+                         'is_learning': lookup(issues['is_learning'], issue_id, False),
+                         'is_management': lookup(issues['is_management'], issue_id, False),
+                         'is_reported': lookup(issues['reporter'].notna(), issue_id, False)},
+                        index=worklogs_calc.index)
+    
+    dims['#hours'] = worklogs_calc['#hours']
+    plan = {'#hours': ('#hours', 'sum'), '#logs': ('#hours', 'count')}
+    if '#logs' in worklogs_calc.columns:
+        dims['#logs'] = worklogs_calc['#logs']
+        plan['#logs'] = ('#logs', 'sum')
+    cube = aggregate(dims, list(dims.columns.drop(['#hours', '#logs'], errors='ignore')), plan, 
+                     dropna=False, backend=backend)
+    
+    return cube.reset_index()
+
+
+def extract_issues(worklogs, backend=None):
     """
     Extracts issues dataset from worklogs and adds useful features.
 
@@ -443,6 +1948,9 @@ def extract_issues(worklogs):
     ----------
     worklogs : pandas.DataFrame
         Preprocessed worklogs.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
 
     Returns
     -------
@@ -451,59 +1959,212 @@ def extract_issues(worklogs):
 
     See Also
     --------
-    calculate_worklogs, extract_projects, conventions.py
+    calculate_worklogs, extract_projects, extract_issues_partial, 
+    merge_issues_partials, conventions.py
+    """
+    partial = extract_issues_partial(worklogs, backend)
+    
+    return merge_issues_partials([partial], backend)
+
+
+def extract_issues_partial(worklogs, backend=None):
+    """
+    Extracts the partial aggregates of the issues from a part of the 
+    worklogs, to be merged with the partial aggregates of the other parts.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs, a part of them in dates order.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
+
+    Returns
+    -------
+    last : pandas.DataFrame
+        Last values of the issues fields, maximum estimate and first and last
+        day by issue (index).
+    hours : pandas.DataFrame
+        Hours by issue and user (index).
+
+    See Also
+    --------
+    merge_issues_partials, calculate_worklogs_partitioned
     """
     issue_cols = ['issue', 'summary', 'type', 'status', 
                   'estimate', 'reporter', 'project']
-    issues = worklogs[issue_cols].groupby('issue').last()
+    last = groupby_last(worklogs[issue_cols], 'issue')
+    
+    dates_plan = {'estimate': ('estimate', 'max'),
+                  'min_date': ('date', 'min'),
+                  'max_date': ('date', 'max')}
+    last = last.drop('estimate', axis=1).join(aggregate(worklogs, 'issue', dates_plan, backend=backend))
     
-    estimate = worklogs[['issue', 'estimate']].groupby('issue').max()['estimate']
-    issues['estimate'] = estimate
+    hours = aggregate(worklogs, ['issue', 'user'], {'#hours': ('#hours', 'sum')}, backend=backend)
     
-    issues_by_user = pd.pivot_table(worklogs, 
-                                    values='#hours', 
-                                    index=['issue'], 
-                                    columns=['user'], 
-                                    aggfunc=np.sum)
+    return last, hours
+
+
+def merge_issues_partials(partials, backend=None):
+    """
+    Merges the partial aggregates of the issues, in dates order, into the 
+    issues dataset and adds useful features.
+
+    Parameters
+    ----------
+    partials : list
+        List of partial aggregates, from extract_issues_partial.
+    backend : str or None (default)
+        Execution backend of the aggregations, pandas or arrow (BACKEND if
+        None).
 
-    leader = issues_by_user.idxmax(axis=1)
-    leader_share = issues_by_user.max(axis=1) / issues_by_user.sum(axis=1)
-    issues['leader'] = [leader.loc[x] if leader_share.loc[x] > Calculate.ISSUES_LEADER_SHARE_LIMIT 
-                        else None for x in leader.index]
-    issues['%leader_share'] = leader_share
+    Returns
+    -------
+    issues : pandas.DataFrame
+        Features extracted from worklogs by issue (index).
 
-    issues['#participants'] = (issues_by_user > 0).sum(axis=1)
-    issues['#hours'] = issues_by_user.sum(axis=1)
+    See Also
+    --------
+    extract_issues, extract_issues_partial
+    """
+    last, hours = partials[0]
+    if len(partials) > 1:
+        # last values of the last part with them, extreme dates and sums
+        dates_plan = {'estimate': ('estimate', 'max'),
+                      'min_date': ('min_date', 'min'),
+                      'max_date': ('max_date', 'max')}
+        last = concat_worklogs([partial[0].reset_index() for partial in partials])
+        last = groupby_last(last.drop(list(dates_plan), axis=1), 'issue').join(
+            aggregate(last, 'issue', dates_plan, backend=backend))
+        hours = concat_worklogs([partial[1].reset_index() for partial in partials])
+        hours = aggregate(hours, ['issue', 'user'], {'#hours': ('#hours', 'sum')}, backend=backend)
+    
+    issues = last[['summary', 'type', 'status', 'estimate', 'reporter', 'project']].copy()
+    
+    leaders = extract_leaders(hours.reset_index(), 'issue', Calculate.ISSUES_LEADER_SHARE_LIMIT, backend)
+    issues = issues.join(leaders)
     issues['%share'] = issues['#hours'] / issues['#hours'].sum()
     
-    issues['min_date'] = worklogs[['issue', 'date']].groupby('issue').min()
-    issues['max_date'] = worklogs[['issue', 'date']].groupby('issue').max()
+    issues['min_date'] = last['min_date']
+    issues['max_date'] = last['max_date']
     issues['duration'] = (issues['max_date'] - issues['min_date']).dt.days + 1
     
     issues['is_bug'] = issues['type'] == 'bug'
     
-    summaries = list(issues['summary'].values)
-    is_meeting = []
-    is_learning = []
-    is_management = []
-    for summary in summaries:
-        meet = sum([meet_word in summary for meet_word in Calculate.SUMMARY_MEETING_WORDS])
-        is_meeting.append(bool(meet))
-        
-        learn = sum([meet_word in summary for meet_word in Calculate.SUMMARY_LEARNING_WORDS])
-        is_learning.append(bool(learn))
-        
-        management = sum([meet_word in summary for meet_word in Calculate.SUMMARY_MANAGEMENT_WORDS])
-        is_management.append(bool(management))
-        
-    issues['is_meeting'] = is_meeting
-    issues['is_learning'] = is_learning
-    issues['is_management'] = is_management
+    summary_flags = extract_summary_flags(issues['summary'])
+    issues = issues.join(summary_flags)
     
     return issues
 
 
-def extract_projects(worklogs, issues):
+def extract_summary_flags(summaries):
+    """
+    Flags summaries containing any of the meeting, learning or management
+    words, scanning each distinct summary once with a single regular
+    expression. Flags of the last SUMMARY_CACHE_SIZE summaries classified
+    are kept to reuse them in later calls.
+
+    Parameters
+    ----------
+    summaries : pandas.Series
+        Issues summaries.
+
+    Returns
+    -------
+    flags : pandas.DataFrame
+        is_meeting, is_learning and is_management flags by summary (index
+        of summaries).
+
+    See Also
+    --------
+    compile_summary_classifier, clear_summary_flags, conventions.py
+    """
+    words_lists = (tuple(Calculate.SUMMARY_MEETING_WORDS), 
+                   tuple(Calculate.SUMMARY_LEARNING_WORDS),
+                   tuple(Calculate.SUMMARY_MANAGEMENT_WORDS))
+    regex, words_flags = compile_summary_classifier(*words_lists)
+    # flags of the summaries classified with the same words
+    if words_lists not in _summary_flags:
+        _summary_flags.clear()
+    known = _summary_flags.setdefault(words_lists, {})
+    codes, texts = pd.factorize(summaries)
+    texts = list(texts)
+    
+    new = pd.Series([text for text in texts if text not in known], dtype=object)
+    if len(new):
+        words = new.str.findall(regex).explode()
+        found = words_flags.reindex(words.values).fillna(False).set_axis(words.index)
+        found = found.groupby(level=0).any().reindex(new.index, fill_value=False)
+        known.update(zip(new, found.itertuples(index=False, name=None)))
+    
+    flags = np.array([known[text] for text in texts] + [(False,) * words_flags.shape[1]], dtype=bool)
+    flags = pd.DataFrame(flags[codes], index=summaries.index, columns=words_flags.columns)
+    
+    # only the last classified summaries are kept
+    excess = len(known) - Calculate.SUMMARY_CACHE_SIZE
+    for text in list(islice(known, max(excess, 0))):
+        del known[text]
+    
+    return flags
+
+
+# flags by summary already classified, by words lists, filled by
+# extract_summary_flags
+_summary_flags = {}
+
+
+def clear_summary_flags():
+    """
+    Clears the flags of the summaries kept by extract_summary_flags.
+
+    See Also
+    --------
+    extract_summary_flags
+    """
+    _summary_flags.clear()
+
+
+@lru_cache(maxsize=8)
+def compile_summary_classifier(meeting_words, learning_words, management_words):
+    """
+    Compiles the summaries classifier from the words lists: a regular
+    expression matching any word (longest first) at every position and the
+    flags of each word, including the flags of the words it starts with, as
+    they match at the same position.
+
+    Parameters
+    ----------
+    meeting_words : tuple
+        Words of issues related to meetings.
+    learning_words : tuple
+        Words of issues related to learning and innovation.
+    management_words : tuple
+        Words of issues related to work and team management.
+
+    Returns
+    -------
+    regex : re.Pattern
+        Regular expression of all the words.
+    words_flags : pandas.DataFrame
+        is_meeting, is_learning and is_management flags by word (index).
+
+    See Also
+    --------
+    extract_summary_flags
+    """
+    words_lists = {'is_meeting': meeting_words,
+                   'is_learning': learning_words,
+                   'is_management': management_words}
+    words = sorted(set().union(*words_lists.values()), key=len, reverse=True)
+    words_flags = pd.DataFrame({flag: [any(word.startswith(x) for x in flag_words) for word in words]
+                                for flag, flag_words in words_lists.items()}, index=words)
+    regex = re.compile('(?=(' + '|'.join(re.escape(word) for word in words) + '))')
+    
+    return regex, words_flags
+
+
+def extract_projects(worklogs, issues, backend=None):
     """
     Extracts projects dataset from worklogs and adds useful features.
 
@@ -511,6 +2172,11 @@ def extract_projects(worklogs, issues):
     ----------
     worklogs : pandas.DataFrame
        Preprocessed worklogs.
+    issues : pandas.DataFrame
+       Issues features extracted from worklogs.
+    backend : str or None (default)
+       Execution backend of the aggregations, pandas or arrow (BACKEND if
+       None).
 
     Returns
     -------
@@ -521,23 +2187,192 @@ def extract_projects(worklogs, issues):
     --------
     calculate_worklogs, extract_issues, conventions.py
     """
-    projects = issues.groupby('project').count()[['summary']]
+    projects = issues.groupby('project', observed=True).count()[['summary']]
     projects = projects.rename({'summary': '#issues'}, axis=1)
     
-    projects_by_user = pd.pivot_table(worklogs, 
-                                      values='#hours', 
-                                      index=['project'], 
-                                      columns=['user'], 
-                                      aggfunc=np.sum)
-    
-    leader = projects_by_user.idxmax(axis=1)
-    leader_share = projects_by_user.max(axis=1) / projects_by_user.sum(axis=1)    
-    projects['leader'] = [leader.loc[x] if leader_share.loc[x] > Calculate.PROJECTS_LEADER_SHARE_LIMIT 
-                          else None for x in leader.index]
-    projects['%leader_share'] = leader_share
-
-    projects['#participants'] = (projects_by_user > 0).sum(axis=1)
-    projects['#hours'] = projects_by_user.sum(axis=1)
+    leaders = extract_leaders(worklogs, 'project', Calculate.PROJECTS_LEADER_SHARE_LIMIT, backend)
+    projects = projects.join(leaders)
     projects['%share'] = projects['#hours'] / projects['#hours'].sum()
     
     return projects
+
+
+def extract_leaders(worklogs, by, limit, backend=None):
+    """
+    Extracts the leader (user with most hours), its share of hours, the
+    number of participants and the hours by issue or project, from the hours
+    by group and user in long format.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+       Preprocessed worklogs.
+    by : str
+       Column to group by (issue or project).
+    limit : float
+       Share of hours above which the user with most hours is the leader.
+    backend : str or None (default)
+       Execution backend of the aggregations, pandas or arrow (BACKEND if
+       None).
+
+    Returns
+    -------
+    leaders : pandas.DataFrame
+       Leader, %leader_share, #participants and #hours by group (index).
+
+    See Also
+    --------
+    extract_issues, extract_projects
+    """
+    hours = aggregate(worklogs, [by, 'user'], {'#hours': ('#hours', 'sum')}, backend=backend)['#hours']
+    group = hours.groupby(level=by, observed=True)
+    
+    leaders = pd.DataFrame(index=group.size().index)
+    # first user (in order) with the maximum hours in the group
+    leader = hours[hours == group.transform('max')].groupby(level=by, observed=True).head(1)
+    leader = leader.reset_index('user')['user'].astype(object)
+    leader_share = group.max() / group.sum()
+    leaders['leader'] = np.where(leader_share > limit, leader.reindex(leaders.index), None)
+    leaders['%leader_share'] = leader_share
+    
+    leaders['#participants'] = (hours > 0).groupby(level=by, observed=True).sum()
+    leaders['#hours'] = group.sum()
+    
+    return leaders
+
+
+def aggregate(data, by, plan, dropna=True, backend=None):
+    """
+    Aggregates data by group as a named aggregation, with the pandas groupby
+    or with the multi-threaded hash aggregation of Arrow tables. Both 
+    backends obtain the same result, sorted by group.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Data to group.
+    by : str or list
+        Column or columns to group by.
+    plan : dict
+        Output columns as keys and tuples of column and function (sum, min,
+        max, mean, size, count or nunique) as values.
+    dropna : bool
+        It indicates if groups with missing values are ignored (True, 
+        default).
+    backend : str or None (default)
+        pandas or arrow, BACKEND if None.
+
+    Returns
+    -------
+    aggregated : pandas.DataFrame
+        Aggregated columns by group (index).
+
+    See Also
+    --------
+    conventions.py
+    """
+    by_cols = [by] if isinstance(by, str) else by
+    backend = Calculate.BACKEND if backend is None else backend
+    if backend == 'pandas':
+        return data.groupby(by, observed=True, dropna=dropna).agg(**plan)
+    if backend != 'arrow':
+        raise ValueError('Unknown backend: ' + str(backend))
+    
+    # categorical columns by their codes (missing if -1)
+    value_cols = list(dict.fromkeys(col for col, _ in plan.values()))
+    arrays = {}
+    for col in by_cols + [col for col in value_cols if col not in by_cols]:
+        values = data[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.values
+            arrays[col] = pa.array(codes, mask=codes < 0)
+        else:
+            arrays[col] = pa.array(values.values, from_pandas=True)
+    table = pa.table(arrays)
+    if dropna:
+        for col in by_cols:
+            table = table.filter(pc.is_valid(table[col]))
+    
+    functions = {'sum': ('sum', pc.ScalarAggregateOptions(min_count=0)),
+                 'min': ('min', None), 'max': ('max', None), 'mean': ('mean', None),
+                 'size': ('count', pc.CountOptions(mode='all')),
+                 'count': ('count', None), 'nunique': ('count_distinct', None)}
+    aggregations = {(col, functions[func][0]): (col, *functions[func]) for col, func in plan.values()}
+    aggregated = table.group_by(by_cols).aggregate(list(aggregations.values())).to_pandas()
+    aggregated = aggregated.sort_values(by_cols, na_position='last', kind='stable')
+    
+    index = []
+    for col in by_cols:
+        keys = aggregated[col]
+        if isinstance(data[col].dtype, pd.CategoricalDtype):
+            keys = pd.Categorical.from_codes(keys.fillna(-1).astype(int), dtype=data[col].dtype)
+        elif keys.notna().all():
+            keys = keys.astype(data[col].dtype)
+        index.append(pd.Index(keys, name=col))
+    if len(index) > 1:
+        # levels of the values found, sorted as in pandas
+        codes, levels = zip(*[pd.factorize(keys, sort=True) for keys in index])
+        index = pd.MultiIndex(levels=levels, codes=codes, names=by_cols)
+    else:
+        index = index[0]
+    columns = {name: aggregated[col + '_' + functions[func][0]].values 
+               for name, (col, func) in plan.items()}
+    # float columns keep their precision, as in pandas
+    for name, (col, func) in plan.items():
+        if func in ('sum', 'min', 'max', 'mean') and data[col].dtype.kind == 'f':
+            columns[name] = columns[name].astype(data[col].dtype)
+    
+    return pd.DataFrame(columns, index=index)
+
+
+def groupby_last(data, by):
+    """
+    Obtains the last non null value of each column by group, computing 
+    categorical columns on their codes.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Data to group.
+    by : str or list
+        Column or columns to group by.
+
+    Returns
+    -------
+    last : pandas.DataFrame
+        Last values by group (index).
+    """
+    by_cols = [by] if isinstance(by, str) else by
+    categorical = [col for col in data.columns
+                   if col not in by_cols and isinstance(data[col].dtype, pd.CategoricalDtype)]
+    codes = data.copy()
+    for col in categorical:
+        codes[col] = data[col].cat.codes.where(data[col].notna())
+    last = codes.groupby(by, observed=True).last()
+    for col in categorical:
+        last[col] = pd.Categorical.from_codes(last[col].fillna(-1).astype(int), 
+                                              dtype=data[col].dtype)
+        
+    return last
+
+
+def lookup(values, codes, fill_value=None):
+    """
+    Takes values by position, -1 codes take a missing value.
+
+    Parameters
+    ----------
+    values : array-like
+        Values of a dimension (issues or projects) column.
+    codes : array-like
+        Positions to take.
+    fill_value : scalar or None (default)
+        Value for -1 codes, missing value of values type if None.
+
+    Returns
+    -------
+    values : array-like
+        Values by code.
+    """
+    values = pd.Series(values).array
+    return values.take(np.asarray(codes), allow_fill=True, fill_value=fill_value)
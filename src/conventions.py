@@ -4,17 +4,49 @@ class Read:
     
     WORKLOG_FOLDER : folder from which time log files downloaded from Jira are
     read.
+    FILE_FORMATS : dictionary of the extensions of the time log files to read
+    and their format: excel (as downloaded from Jira), csv, parquet or json
+    (one time log per line). Other files in the folder are ignored.
+    DATES_SIDECAR_SUFFIX : suffix of the file, next to a non excel time log
+    file, that defines the dates of the summary of time logs as a json
+    object with "min_date" and "max_date". If it does not exist, dates are
+    inferred from the first and last work dates.
     WORKLOG_SHEET_NAME : name of the sheet in the file containing the time
     logs.
     DATES_SHEET_NAME : name of the sheet in the file containing the summary of
     time logs dates.
     RENAME_STATUS : dictionary to unify the names of issue status fields.
     DTYPES_FIELDS : dictionary to define the variable type of each field.
+    CACHE_FOLDER : folder in which the parsed worklogs files are stored in
+    parquet format, so that only new or modified files are parsed again. If
+    None, the files are parsed on every read.
+    WORKERS : number of processes used to parse the worklogs files. If None,
+    one process per CPU core is used.
+    OVERLAPS : method to resolve the overlaps between files. If 'dates', each
+    file is only loaded until the first date of the next file, so the most
+    recent export of a date prevails. If 'rows', all the time logs of all
+    files are loaded and duplicates are dropped.
+    DUPLICATES_FIELDS : fields that identify a time log to drop duplicates.
 
     """
     WORKLOG_FOLDER = '../data/timeUsers/'
     WORKLOG_SHEET_NAME = 'Worklogs'  
     DATES_SHEET_NAME = 'People'
+    
+    FILE_FORMATS = {
+        '.xlsx': 'excel',
+        '.xls': 'excel',
+        '.csv': 'csv',
+        '.parquet': 'parquet',
+        '.jsonl': 'json'
+    }
+    DATES_SIDECAR_SUFFIX = '.dates.json'
+    
+    CACHE_FOLDER = '../data/cache/'
+    WORKERS = 1
+    
+    OVERLAPS = 'dates'
+    DUPLICATES_FIELDS = ['Issue Key', 'Username', 'Work date', 'Hours', 'Work Description']
 
     RENAME_STATUS = {
         'Issue tatus': 'Issue Status',
@@ -54,6 +86,8 @@ class Preprocess:
     """
     Parameters to preprocess the worklogs files.
     
+    FIELDS_RENAME : dictionary of the fields used in the study and the name
+    given to them. Only these fields are read by the preprocessing pipeline.
     USERS_RENAME : dictionary that allows you to rename users. It is useful if
     you need to unify two employees, in case the same person is registered
     with two names, for example, "rosario" and "charo".
@@ -65,6 +99,19 @@ class Preprocess:
     PROJECTS_TO_DROP : projects to be ignored in the study.
 
     """
+    FIELDS_RENAME = {
+        'Issue Key': 'issue', 
+        'Issue summary': 'summary', 
+        'Issue Type': 'type', 
+        'Issue Status': 'status',
+        'Issue Original Estimate': 'estimate', 
+        'Reporter': 'reporter', 
+        'Project Key': 'project', 
+        'Username': 'user', 
+        'Work date': 'date', 
+        'Hours': '#hours'
+    }
+    
     USERS_RENAME = {}
     PROJECTS_RENAME = {
         'kiss': 'kis',
@@ -93,18 +140,38 @@ class Calculate:
     project can have more than one leader.
     USERS_MIN_YEARLY_HOURS : minimum recorded time required to analyze
     employee performance. If it is less, it is ignored in the study.
+    CAPACITY_WEEKMASK : working days of the week, from Monday to Sunday, to
+    compute the expected working hours.
+    CAPACITY_HOLIDAYS : dictionary of holidays calendars, names as keys and
+    lists of dates (YYYY-MM-DD) as values, e.g. by country or team.
+    CAPACITY_DEFAULT_CALENDAR : name of the holidays calendar of employees
+    not included in CAPACITY_USERS_CALENDAR.
+    CAPACITY_USERS_CALENDAR : dictionary of employees (usernames) and the
+    name of their holidays calendar.
     SUMMARY_MEETING_WORDS : list of words or word roots for the identification
     of issues related to meetings.
     SUMMARY_LEARNING_WORDS : list of words or word roots for the identification
     of issues related to learning and innovation.
     SUMMARY_MANAGEMENT_WORDS : list of words or word roots for the identification
     of issues related to work and team management.
+    SUMMARY_CACHE_SIZE : maximum number of summaries whose flags are kept to
+    reuse them in later calculations (e.g. updates of the calculation state).
     AGGREGATION_STD_LIMIT : number of standard deviations to shorten the
     standardized metrics.
     AGGREGATION_WEIGHTS :dictionary of weights by performance dimension to
     perform the aggregation into a single metric. The dictionary keys should
     be the 4 calculated dimensions (productivity, adaptability, teamwork,
     mentoring) and the values to their corresponding weight.
+    STATE_FILE : file in which the calculation state (worklogs, issues,
+    projects and metrics by year) is saved to update it with new exports.
+    BACKEND : execution backend of the aggregations by group, pandas or arrow
+    (multi-threaded hash aggregation of pyarrow tables).
+    PARTITIONS_FREQ : period of the partitions of worklogs (pandas period 
+    alias) when they are calculated by partitions, with bounded memory.
+    PARTITIONS_FOLDER : folder in which the partitions of worklogs are 
+    temporarily stored in parquet format.
+    WORKERS : number of processes used to calculate the metrics by year and
+    cohort. If None, one process per CPU core is used.
     
     """
     
@@ -112,6 +179,13 @@ class Calculate:
     PROJECTS_LEADER_SHARE_LIMIT = 0.5
     
     USERS_MIN_YEARLY_HOURS = 3 * 22 * 8 # 3 months
+    
+    CAPACITY_WEEKMASK = '1111100'
+    CAPACITY_HOLIDAYS = {'default': []}
+    CAPACITY_DEFAULT_CALENDAR = 'default'
+    CAPACITY_USERS_CALENDAR = {}
+    
+    CAPACITY_USERS_CALENDAR = {x.lower(): y for x, y in CAPACITY_USERS_CALENDAR.items()}
 
     SUMMARY_MEETING_WORDS = ['meet', 'conversation', 'team building']
     SUMMARY_LEARNING_WORDS = ['learn', 'research', 'study', 'course']
@@ -122,6 +196,8 @@ class Calculate:
     SUMMARY_LEARNING_WORDS = [x.lower() for x in SUMMARY_LEARNING_WORDS]
     SUMMARY_MANAGEMENT_WORDS = [x.lower() for x in SUMMARY_MANAGEMENT_WORDS]
     
+    SUMMARY_CACHE_SIZE = 100000
+    
     AGGREGATION_STD_LIMIT = 1
     AGGREGATION_WEIGHTS = {'productivity': 0.25,
                            'adaptability': 0.25,
@@ -129,6 +205,15 @@ class Calculate:
                            'mentoring': 0.25
                           }
     
+    STATE_FILE = '../data/cache/state.pkl'
+    
+    BACKEND = 'pandas'
+    
+    PARTITIONS_FREQ = 'M'
+    PARTITIONS_FOLDER = '../data/cache/partitions/'
+    
+    WORKERS = 1
+    
     
 class Report:
     """
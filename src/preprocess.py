@@ -1,14 +1,39 @@
 import warnings
 warnings.filterwarnings("ignore")
 import pandas as pd
+import numpy as np
+import pyarrow.parquet as pq
+import pyarrow.json as pj
+import pyarrow.csv as pv
 import os
 import datetime
+import hashlib
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 from conventions import Read, Preprocess
 
-def read_worklogs_files():
+def read_worklogs_files(cache=True, workers=Read.WORKERS, columns=None, overlaps=Read.OVERLAPS):
     """
-    Reads the worklogs files information and drops duplicates.
+    Reads the worklogs files information and drops duplicates. By dates, the
+    dates of every file are read first to resolve the overlaps between files,
+    then the time logs are only read from the selected files and dates. By
+    rows, all the time logs are read and the duplicated ones are dropped.
+
+    Parameters
+    ----------
+    cache : bool
+        It indicates if the parsed files are stored in and read from
+        Read.CACHE_FOLDER (True, default) or parsed again (False).
+    workers : int or None
+        Number of processes used to parse the files. If 1, files are parsed
+        in the current process; if None, one process per CPU core is used.
+        The result does not depend on the number of processes.
+    columns : list or None (default)
+        Fields to read. If None, all the fields are read.
+    overlaps : str
+        Method to resolve the overlaps between files: 'dates' or 'rows'.
 
     Returns
     -------
@@ -17,21 +42,301 @@ def read_worklogs_files():
 
     See Also
     --------
-    conventions
+    iter_worklogs_files, read_preprocessed_worklogs, conventions
+    """
+    worklogs = pd.concat(list(iter_worklogs_files(cache, workers, columns, overlaps)))    
+    
+    worklogs = worklogs.reset_index(drop=True)
+    dtypes_ = {key: value for key, value in Read.DTYPES_FIELDS.items() if key in worklogs.columns}
+    worklogs = worklogs.astype(dtypes_)
+    
+    return worklogs
+
+
+def read_preprocessed_worklogs(cache=True, workers=Read.WORKERS, overlaps=Read.OVERLAPS):
+    """
+    Reads and preprocesses the worklogs files one by one, so that only one
+    raw file is held in memory at a time. Only the fields needed by the 
+    preprocessing are read. The result is the same as 
+    preprocess_worklogs(read_worklogs_files()).
+
+    Parameters
+    ----------
+    cache : bool
+        It indicates if the parsed files are stored in and read from
+        Read.CACHE_FOLDER (True, default) or parsed again (False).
+    workers : int or None
+        Number of processes used to parse the files. If 1, files are parsed
+        in the current process; if None, one process per CPU core is used.
+    overlaps : str
+        Method to resolve the overlaps between files: 'dates' or 'rows'.
+
+    Returns
+    -------
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs.
+
+    See Also
+    --------
+    iter_worklogs_files, clean_worklogs, sort_worklogs
+    """
+    columns = list(Preprocess.FIELDS_RENAME)
+    # every cleaned part is merged and dropped before the next one is read
+    worklogs = (clean_worklogs(worklog) 
+                for worklog in iter_worklogs_files(cache, workers, columns, overlaps))
+    
+    return concat_worklogs(worklogs, sort=True)
+
+
+def concat_worklogs(worklogs, sort=False):
+    """
+    Concatenates cleaned worklogs, sharing the categories of the categorical
+    columns so that they are kept as categorical. The parts are consumed one
+    by one: their values (codes of categorical columns) are appended to 
+    buffers by column and every part is dropped once appended, then the 
+    columns are concatenated one at a time.
+
+    Parameters
+    ----------
+    worklogs : iterable
+        Parts (pandas.DataFrame) of cleaned worklogs, e.g. a generator.
+    sort : bool
+        It indicates if the result is ordered as by sort_worklogs (the order
+        is obtained from the sorting columns and applied column by column),
+        False by default.
+
+    Returns
+    -------
+    worklogs : pandas.DataFrame
+        Concatenated worklogs, with a new index.
+
+    See Also
+    --------
+    clean_worklogs, sort_worklogs
+    """
+    buffers = {}
+    dtypes = None
+    for worklog in worklogs:
+        if dtypes is None:
+            dtypes = worklog.dtypes
+        for col in dtypes.index:
+            values = worklog[col]
+            if isinstance(dtypes[col], pd.CategoricalDtype):
+                values = (values.cat.categories, values.cat.codes.values)
+            buffers.setdefault(col, []).append(values)
+        del worklog
+    if dtypes is None:
+        raise ValueError('No worklogs to concatenate')
+    
+    concat = {}
+    order = None
+    if sort:
+        # positions of the rows in the order of sort_worklogs
+        for col in ['date', 'issue', 'user']:
+            concat[col] = concat_column(buffers.pop(col), dtypes[col])
+        order = sort_order(pd.DataFrame(concat, copy=False))
+        concat = {col: values.take(order) for col, values in concat.items()}
+    for col in buffers:
+        values = concat_column(buffers[col], dtypes[col])
+        buffers[col] = None
+        concat[col] = values if order is None else values.take(order)
+    
+    return pd.DataFrame({col: concat[col] for col in dtypes.index}, copy=False)
+
+
+def concat_column(values, dtype):
+    """
+    Concatenates the values of a column of several parts of worklogs, with
+    the categories of all the parts if it is categorical.
+
+    Parameters
+    ----------
+    values : list
+        Values (pandas.Series) of every part, or tuples of categories and
+        codes if categorical.
+    dtype : dtype
+        Type of the column in the first part.
+
+    Returns
+    -------
+    values : array-like
+        Concatenated values.
+
+    See Also
+    --------
+    concat_worklogs
+    """
+    if not isinstance(dtype, pd.CategoricalDtype):
+        return pd.concat(values, ignore_index=True).values
+    
+    categories = set().union(*[part_categories for part_categories, _ in values])
+    categories = pd.Index(sorted(categories), dtype=object)
+    # codes of every part translated to the shared categories, -1 if missing
+    codes_dtype = np.min_scalar_type(-len(categories) - 1)
+    codes = [np.append(categories.get_indexer(part_categories), -1).astype(codes_dtype)[part_codes]
+             for part_categories, part_codes in values]
+    dtype = pd.CategoricalDtype(categories, ordered=dtype.ordered)
+    
+    return pd.Categorical.from_codes(np.concatenate(codes), dtype=dtype)
+
+
+def iter_worklogs_files(cache=True, workers=Read.WORKERS, columns=None, overlaps=Read.OVERLAPS):
+    """
+    Generates the time logs of the worklogs files, once the overlaps between
+    files are resolved. When several processes are used, at most one file
+    per process is parsed in advance.
+
+    Parameters
+    ----------
+    cache : bool
+        It indicates if the parsed files are stored in and read from
+        Read.CACHE_FOLDER (True, default) or parsed again (False).
+    workers : int or None
+        Number of processes used to parse the files. If 1, files are parsed
+        in the current process; if None, one process per CPU core is used.
+    columns : list or None (default)
+        Fields to read. If None, all the fields are read.
+    overlaps : str
+        Method to resolve the overlaps between files. If 'dates', files are 
+        yielded in dates order, limited to their dates to load. If 'rows',
+        all files are yielded, without the time logs already yielded.
+
+    Yields
+    ------
+    worklog : pandas.DataFrame
+        Time logs of a file.
+
+    See Also
+    --------
+    read_worklogs_dates, select_worklogs_files, read_worklogs_file,
+    drop_duplicated_worklogs
     """
     folder = Read.WORKLOG_FOLDER
     content = os.listdir(folder)
 
     files = [os.path.join(folder, x) 
              for x in content if os.path.isfile(os.path.join(folder, x))]
-    data = {file: pd.read_excel(file, sheet_name=[Read.WORKLOG_SHEET_NAME, Read.DATES_SHEET_NAME])
-            for file in files}
+    files = [x for x in files if file_format(x) is not None]
+    
+    # parquet files are already columnar, they are not cached
+    cache = cache and Read.CACHE_FOLDER is not None
+    manifest = read_cache_manifest() if cache else None
+    signatures = [file_signature(file, manifest) if cache and file_format(file) != 'parquet' else None 
+                  for file in files]
+    if cache:
+        write_cache_manifest(manifest)
+    
+    # first phase: dates of every file
+    dates = list(imap_files(read_worklogs_dates, workers, files, signatures))
+    dates = dict(zip(files, dates))
+    signatures = dict(zip(files, signatures))
+    
+    if overlaps == 'rows':
+        # most recent files first, so their version of each time log prevails
+        files = sorted(files, key=lambda x: (max(dates[x]), min(dates[x])), reverse=True)
+        read_columns = columns
+        if columns is not None:
+            read_columns = list(dict.fromkeys(list(columns) + Read.DUPLICATES_FIELDS))
+        n = len(files)
+        seen = []
+        for worklog in imap_files(read_worklogs_file, workers, files, 
+                                  [signatures[file] for file in files], 
+                                  [None] * n, [None] * n, [read_columns] * n):
+            worklog = drop_duplicated_worklogs(worklog, seen)
+            if columns is not None:
+                worklog = worklog[read_columns[:len(columns)]]
+            yield worklog
+        return
+    
+    to_load = select_worklogs_files(dates)
+    
+    # second phase: time logs of the selected files and dates
+    n = len(to_load)
+    yield from imap_files(read_worklogs_file, workers, 
+                          list(to_load.index), 
+                          [signatures[file] for file in to_load.index],
+                          list(to_load['min_date']), 
+                          list(to_load['new_max_date']),
+                          [columns] * n)
+
+
+def drop_duplicated_worklogs(worklog, seen):
+    """
+    Drops the time logs of a file that have already been read from other
+    files. Each time log is identified by a hash of Read.DUPLICATES_FIELDS
+    (missing if the file lacks them) and its occurrence number within the 
+    file, so that repeated time logs in the same file are kept, as many 
+    times as in the file that repeats them most.
+
+    Parameters
+    ----------
+    worklog : pandas.DataFrame
+        Time logs of a file.
+    seen : list
+        Sorted arrays of identifiers (uint64) of the time logs already read,
+        in decreasing size. It is updated with the new ones.
+
+    Returns
+    -------
+    worklog : pandas.DataFrame
+        Time logs not read before.
+
+    See Also
+    --------
+    iter_worklogs_files, conventions
+    """
+    fields = worklog.reindex(columns=Read.DUPLICATES_FIELDS)
+    fields = fields.astype({key: value for key, value in Read.DTYPES_FIELDS.items() 
+                            if key in Read.DUPLICATES_FIELDS})
+    fingerprint = pd.util.hash_pandas_object(fields, index=False)
+    occurrence = fingerprint.groupby(fingerprint).cumcount()
+    keys = pd.DataFrame({'fingerprint': fingerprint.values, 'occurrence': occurrence.values})
+    keys = pd.util.hash_pandas_object(keys, index=False).values
+    
+    # binary search of the sorted identifiers in every sorted array already 
+    # read
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    is_new = np.ones(len(keys), dtype=bool)
+    for chunk in seen:
+        position = np.minimum(chunk.searchsorted(keys), len(chunk) - 1)
+        is_new &= chunk[position] != keys
+    # arrays of similar size are merged, so every identifier is merged a
+    # logarithmic number of times and there are few arrays to search
+    if is_new.any():
+        seen.append(keys[is_new])
+    while len(seen) > 1 and len(seen[-2]) <= 2 * len(seen[-1]):
+        last = seen.pop()
+        seen[-1] = np.sort(np.concatenate([seen[-1], last]), kind='stable')
     
+    return worklog[is_new[np.argsort(order)]]
+
+
+def select_worklogs_files(dates):
+    """
+    Resolves the overlaps between worklogs files: files are ordered by dates
+    and each file is loaded until the first date of the next one. Files 
+    without days left to load are discarded.
+
+    Parameters
+    ----------
+    dates : dict
+        Files paths as keys and the dates of the summary of time logs as
+        values.
+
+    Returns
+    -------
+    to_load : pandas.DataFrame
+        Selected files (index), ordered by dates, with the dates to load from
+        each file (min_date, new_max_date).
+
+    See Also
+    --------
+    read_worklogs_files
+    """
     intervals = []
-    for file in files:
-        people = data[file][Read.DATES_SHEET_NAME]
-        dates = [col for col in people.columns if type(col) == datetime.datetime]
-        people_dates = pd.Series(dates, index=dates, name=file)
+    for file, file_dates in dates.items():
+        people_dates = pd.Series(file_dates, index=file_dates, name=file)
         intervals.append(people_dates)
     intervals = pd.concat(intervals, axis=1)    
     
@@ -47,29 +352,428 @@ def read_worklogs_files():
         to_drop = to_load[to_load['to_load'] <= 0].index
         to_load = to_load.drop(to_drop)
         
-    worklogs = []
-    for file in to_load.index:
-        worklog = data[file][Read.WORKLOG_SHEET_NAME]
-        worklog = worklog[worklog['Work date'] >= to_load.loc[file, 'min_date']]
-        worklog = worklog[worklog['Work date'] <= to_load.loc[file, 'new_max_date']]
-        
-        to_drop = [x for x in worklog.columns if 'Unnamed' in x]
-        worklog = worklog.drop(to_drop, axis=1)
-        
-        worklog = worklog.rename(Read.RENAME_STATUS, axis=1)
-        
-        to_drop = worklog[worklog['Work date'].isna()].index
-        worklog = worklog.drop(to_drop)
-        
-        worklogs.append(worklog)
-        
-    worklogs = pd.concat(worklogs)    
+    return to_load
+
+
+def imap_files(function, workers, *args):
+    """
+    Applies a reading function to several files, in the current process or
+    in a pool of processes. Results are generated in the same order as the
+    arguments and, in a pool, at most one file per process is read in 
+    advance.
+
+    Parameters
+    ----------
+    function : callable
+        Function to apply, defined at module level.
+    workers : int or None
+        Number of processes. If 1, the current process is used; if None, one
+        process per CPU core is used.
+    *args : list
+        Lists of arguments of the function, one element per file.
+
+    Yields
+    ------
+    result : object
+        Result of the function for each file.
+    """
+    if workers == 1:
+        yield from map(function, *args)
+        return
     
-    worklogs = worklogs.reset_index(drop=True)
-    dtypes_ = {key: value for key, value in Read.DTYPES_FIELDS.items() if key in worklogs.columns}
-    worklogs = worklogs.astype(dtypes_)
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for arg in zip(*args):
+            pending.append(executor.submit(function, *arg))
+            if len(pending) > workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def file_format(file):
+    """
+    Obtains the format of a worklogs file from its extension.
+
+    Parameters
+    ----------
+    file : str
+        Path of the worklogs file.
+
+    Returns
+    -------
+    format : str or None
+        Format of the file (excel, csv, parquet or json) or None if it is not
+        a worklogs file.
+
+    See Also
+    --------
+    conventions
+    """
+    extension = os.path.splitext(file)[1].lower()
     
-    return worklogs
+    return Read.FILE_FORMATS.get(extension)
+
+
+def read_worklogs_dates(file, signature=None):
+    """
+    Reads the dates of the summary of time logs of a worklogs file. For excel
+    files only the header of the summary sheet is parsed. For the rest of
+    formats the dates are read from the sidecar file, if it exists, or
+    inferred from the first and last work dates.
+
+    Parameters
+    ----------
+    file : str
+        Path of the worklogs file.
+    signature : dict or None (default)
+        Signature of the file, as returned by file_signature. If given, the
+        dates are read from or stored in Read.CACHE_FOLDER, and the work 
+        dates are read from the cached time logs if found.
+
+    Returns
+    -------
+    dates : list
+        Dates of the summary of time logs.
+
+    See Also
+    --------
+    read_worklogs_file, file_signature, conventions
+    """
+    format_ = file_format(file)
+    if format_ != 'excel':
+        sidecar = os.path.splitext(file)[0] + Read.DATES_SIDECAR_SUFFIX
+        if os.path.isfile(sidecar):
+            with open(sidecar) as f:
+                interval = json.load(f)
+            interval = [interval['min_date'], interval['max_date']]
+            dates = pd.date_range(*pd.to_datetime(interval).normalize())
+            return list(dates.to_pydatetime())
+    
+    if signature is not None:
+        path = cache_entry(signature, '.dates.parquet')
+        if os.path.isfile(path):
+            return list(pd.read_parquet(path)['date'].dt.to_pydatetime())
+    
+    if format_ == 'excel':
+        people = pd.read_excel(file, sheet_name=Read.DATES_SHEET_NAME, nrows=0)
+        dates = [col for col in people.columns if type(col) == datetime.datetime]
+    else:
+        work_dates = None
+        if signature is not None:
+            # work dates of the time logs already cached, if any
+            for suffix in ('.worklogs.parquet', '.fields.parquet'):
+                entry = cache_entry(signature, suffix)
+                if os.path.isfile(entry) and 'Work date' in pq.read_schema(entry).names:
+                    work_dates = pd.read_parquet(entry, columns=['Work date'])['Work date']
+                    break
+        if work_dates is None:
+            work_dates = parse_worklogs_file(file, ['Work date'])['Work date']
+        interval = [work_dates.min(), work_dates.max()]
+        dates = list(pd.date_range(*pd.to_datetime(interval).normalize()).to_pydatetime())
+    
+    if signature is not None:
+        write_cache_entry(pd.DataFrame({'date': dates}), path)
+    
+    return dates
+
+
+def read_worklogs_file(file, signature=None, min_date=None, max_date=None, columns=None):
+    """
+    Reads the time logs of a worklogs file between two dates. If the file 
+    signature is given, the file is only parsed when it is not found in
+    Read.CACHE_FOLDER, otherwise it is read from the cache.
+
+    Parameters
+    ----------
+    file : str
+        Path of the worklogs file.
+    signature : dict or None (default)
+        Signature of the file, as returned by file_signature. If None, the
+        file is parsed.
+    min_date : datetime or None (default)
+        First date to read. If None, time logs are read from the beginning.
+    max_date : datetime or None (default)
+        Last date to read. If None, time logs are read until the end.
+    columns : list or None (default)
+        Fields to read. If None, all the fields are read.
+
+    Returns
+    -------
+    worklog : pandas.DataFrame
+        Time logs contained in the file between the dates.
+
+    See Also
+    --------
+    parse_worklogs_file, file_signature, conventions
+    """
+    if columns is not None:
+        columns = list(dict.fromkeys(list(columns) + ['Work date']))
+    filters = []
+    if min_date is not None:
+        filters.append(('Work date', '>=', pd.Timestamp(min_date)))
+    if max_date is not None:
+        filters.append(('Work date', '<=', pd.Timestamp(max_date)))
+    
+    requested = columns
+    worklog = None
+    if signature is not None:
+        # complete entries hold every field, partial entries the fields read so far
+        complete = cache_entry(signature, '.worklogs.parquet')
+        partial = cache_entry(signature, '.fields.parquet')
+        if os.path.isfile(complete):
+            cached = pq.read_schema(complete).names
+            if columns is not None:
+                columns = [x for x in columns if x in cached]
+            # columns and dates filter are pushed down to the parquet reader
+            worklog = pd.read_parquet(complete, columns=columns, filters=filters or None)
+        elif columns is not None and os.path.isfile(partial):
+            cached = pq.read_schema(partial).names
+            if set(columns) <= set(cached):
+                worklog = pd.read_parquet(partial, columns=columns, filters=filters or None)
+            else:
+                # parse again, keeping the fields already cached
+                columns = cached + [x for x in columns if x not in cached]
+    if worklog is None:
+        worklog = parse_worklogs_file(file, columns)
+        if signature is not None and columns is None:
+            write_cache_entry(worklog, complete)
+            if os.path.isfile(partial):
+                os.remove(partial)
+        elif signature is not None:
+            write_cache_entry(worklog, partial)
+    if requested is not None:
+        worklog = set_worklogs_types(worklog.reindex(columns=requested))
+    
+    if min_date is not None:
+        worklog = worklog[worklog['Work date'] >= min_date]
+    if max_date is not None:
+        worklog = worklog[worklog['Work date'] <= max_date]
+    to_drop = worklog[worklog['Work date'].isna()].index
+    worklog = worklog.drop(to_drop)
+    
+    return worklog
+
+
+def parse_worklogs_file(file, columns=None):
+    """
+    Parses the time logs of a worklogs file downloaded from Jira, or exported
+    to other format: drops unnamed columns, unifies names and sets the 
+    variable types. If the fields to read are given, the rest of fields are
+    not converted and the types are set while parsing.
+
+    Parameters
+    ----------
+    file : str
+        Path of the worklogs file, in any of the formats in Read.FILE_FORMATS.
+    columns : list or None (default)
+        Fields to read. Fields missing in the file are added empty. If None,
+        all the fields in the file are read.
+
+    Returns
+    -------
+    worklog : pandas.DataFrame
+        Time logs contained in the file. Fields without a defined type keep
+        the type inferred by the reader.
+
+    See Also
+    --------
+    conventions
+    """
+    usecols = None
+    dtypes_ = None
+    if columns is not None:
+        # names in the file, before unifying them
+        aliases = {alias: name for alias, name in Read.RENAME_STATUS.items() if name in columns}
+        aliases.update({name: name for name in columns})
+        usecols = lambda x: x in aliases
+        dtypes_ = {alias: Read.DTYPES_FIELDS[name] for alias, name in aliases.items()
+                   if name in Read.DTYPES_FIELDS and 'datetime' not in Read.DTYPES_FIELDS[name]}
+    
+    format_ = file_format(file)
+    if format_ == 'excel':
+        worklog = pd.read_excel(file, sheet_name=Read.WORKLOG_SHEET_NAME,
+                                usecols=usecols, dtype=dtypes_)
+    elif format_ == 'csv':
+        names = None
+        if usecols is not None:
+            names = [x for x in pv.open_csv(file).schema.names if usecols(x)]
+        # multi-threaded reading, empty strings as missing values as in pandas
+        options = pv.ConvertOptions(include_columns=names, strings_can_be_null=True)
+        worklog = pv.read_csv(file, convert_options=options).to_pandas()
+    elif format_ == 'parquet':
+        names = pq.read_schema(file).names
+        if usecols is not None:
+            names = [x for x in names if usecols(x)]
+        worklog = pd.read_parquet(file, columns=names)
+    else:
+        worklog = pj.read_json(file).to_pandas()
+        if usecols is not None:
+            worklog = worklog[[x for x in worklog.columns if usecols(x)]]
+    if 'Work date' in worklog.columns:
+        worklog['Work date'] = pd.to_datetime(worklog['Work date'])
+    
+    to_drop = [x for x in worklog.columns if 'Unnamed' in x]
+    worklog = worklog.drop(to_drop, axis=1)
+    
+    worklog = worklog.rename(Read.RENAME_STATUS, axis=1)
+    if columns is not None:
+        worklog = worklog.reindex(columns=columns)
+    
+    return set_worklogs_types(worklog)
+
+
+def set_worklogs_types(worklog):
+    """
+    Sets the variable types of the time logs fields defined in 
+    Read.DTYPES_FIELDS. The rest of fields are not converted.
+
+    Parameters
+    ----------
+    worklog : pandas.DataFrame
+        Time logs.
+
+    Returns
+    -------
+    worklog : pandas.DataFrame
+        Time logs with the variable types set.
+
+    See Also
+    --------
+    conventions
+    """
+    dtypes_ = {key: value for key, value in Read.DTYPES_FIELDS.items() if key in worklog.columns}
+    
+    return worklog.astype(dtypes_)
+
+
+def file_signature(file, manifest):
+    """
+    Obtains the signature of a worklogs file to look it up in the cache. The
+    content hash is only recomputed if the size or the modification time of
+    the file have changed since it was recorded in the manifest.
+
+    Parameters
+    ----------
+    file : str
+        Path of the worklogs file.
+    manifest : dict
+        Cache manifest, as returned by read_cache_manifest. It is updated
+        with the current signature of the file.
+
+    Returns
+    -------
+    signature : dict
+        Size, modification time and content hash of the file.
+
+    See Also
+    --------
+    read_worklogs_file, read_cache_manifest
+    """
+    stat = os.stat(file)
+    key = os.path.abspath(file)
+    signature = manifest.get(key, {})
+    if signature.get('size') != stat.st_size or signature.get('mtime') != stat.st_mtime_ns:
+        sha = hashlib.sha256()
+        with open(file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        signature = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': sha.hexdigest()}
+        manifest[key] = signature
+    
+    return signature
+
+
+def cache_entry(signature, suffix):
+    """
+    Obtains the path of a cache entry of a worklogs file. Entries are keyed
+    by the content hash of the file and by the digest of the reading 
+    conventions, since they store the time logs with the fields renamed and
+    typed: entries written with other conventions are not reused.
+
+    Parameters
+    ----------
+    signature : dict
+        Signature of the file, as returned by file_signature.
+    suffix : str
+        Suffix of the entry (e.g. .worklogs.parquet).
+
+    Returns
+    -------
+    path : str
+        Path of the cache entry in Read.CACHE_FOLDER.
+
+    See Also
+    --------
+    file_signature, conventions
+    """
+    conventions = {'worklog_sheet': Read.WORKLOG_SHEET_NAME, 
+                   'dates_sheet': Read.DATES_SHEET_NAME,
+                   'rename': Read.RENAME_STATUS, 
+                   'dtypes': Read.DTYPES_FIELDS}
+    digest = hashlib.sha256(json.dumps(conventions, sort_keys=True).encode()).hexdigest()
+    
+    return os.path.join(Read.CACHE_FOLDER, signature['hash'] + '.' + digest[:16] + suffix)
+
+
+def write_cache_entry(data, path):
+    """
+    Writes a cache entry in parquet format. It is written under a temporary
+    name, so concurrent readers never find a partial entry.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Data to store.
+    path : str
+        Path of the cache entry.
+    """
+    temp = path + '.' + str(os.getpid())
+    data.to_parquet(temp, index=False)
+    os.replace(temp, path)
+
+
+def read_cache_manifest():
+    """
+    Reads the manifest of the worklogs files cache, creating the cache folder
+    if needed.
+
+    Returns
+    -------
+    manifest : dict
+        Files paths as keys and their signature (size, modification time and
+        content hash) as values.
+
+    See Also
+    --------
+    write_cache_manifest, conventions
+    """
+    os.makedirs(Read.CACHE_FOLDER, exist_ok=True)
+    path = os.path.join(Read.CACHE_FOLDER, 'manifest.json')
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_cache_manifest(manifest):
+    """
+    Writes the manifest of the worklogs files cache.
+
+    Parameters
+    ----------
+    manifest : dict
+        Files paths as keys and their signature (size, modification time and
+        content hash) as values.
+
+    See Also
+    --------
+    read_cache_manifest, conventions
+    """
+    path = os.path.join(Read.CACHE_FOLDER, 'manifest.json')
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=1)
                 
     
 def preprocess_worklogs(worklog):
@@ -89,50 +793,128 @@ def preprocess_worklogs(worklog):
 
     See Also
     --------
-    conventions
+    clean_worklogs, sort_worklogs, conventions
+    """
+    worklog = clean_worklogs(worklog)
+    
+    return sort_worklogs(worklog)
+
+
+def clean_worklogs(worklog):
+    """
+    Cleans raw worklogs: drops irrelevant, renames columns, transforms
+    strings into ordered categories, replaces values, transforms dates and
+    hours. Rows are cleaned independently, so it can be applied file by file.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+        Raw information contained in the worklogs files.
+
+    Returns
+    -------
+    worklogs : pandas.DataFrame
+        Cleaned worklogs, in the original order.
+
+    See Also
+    --------
+    preprocess_worklogs, conventions
     """
     # filter
-    to_keep = ['Issue Key', 'Issue summary', 'Issue Type', 'Issue Status', 
-               'Issue Original Estimate', 'Reporter', 'Project Key', 
-               'Username', 'Work date', 'Hours']
-    worklog = worklog[to_keep]
+    to_keep = list(Preprocess.FIELDS_RENAME)
+    worklog = worklog.reindex(columns=to_keep)
+    dtypes_ = {key: value for key, value in Read.DTYPES_FIELDS.items() if key in to_keep}
+    worklog = worklog.astype(dtypes_)
     
     # rename columns
-    rename = {'Issue Key': 'issue', 
-              'Issue summary': 'summary', 
-              'Issue Type': 'type', 
-              'Issue Status': 'status',
-              'Issue Original Estimate': 'estimate', 
-              'Reporter': 'reporter', 
-              'Project Key': 'project', 
-              'Username': 'user', 
-              'Work date': 'date', 
-              'Hours': '#hours'}
+    rename = Preprocess.FIELDS_RENAME
     worklog = worklog.rename(rename, axis=1)
     
-    # lower string
+    # lower string and replacement, once per distinct value, as categories
+    replace = {'type': Preprocess.TYPES_RENAME,
+               'user': Preprocess.USERS_RENAME,
+               'project': Preprocess.PROJECTS_RENAME}
     string_cols = [key for key, value in Read.DTYPES_FIELDS.items()
                    if value == 'string' and key in to_keep]
     for col in string_cols:
-        worklog[rename[col]] = worklog[rename[col]].str.lower()
-    
-    # replacement
-    worklog['type'] = worklog['type'].replace(Preprocess.TYPES_RENAME)
-    worklog['user'] = worklog['user'].replace(Preprocess.USERS_RENAME)
-    worklog['project'] = worklog['project'].replace(Preprocess.PROJECTS_RENAME)
+        col = rename[col]
+        codes, values = pd.factorize(worklog[col])
+        values = pd.Series(values, dtype='string').str.lower()
+        if col in replace:
+            values = values.replace(replace[col])
+        # renamed values may be merged, categories are ordered as strings
+        values_codes, categories = pd.factorize(values, sort=True)
+        codes = np.where(codes >= 0, values_codes.take(codes), -1)
+        worklog[col] = pd.Categorical.from_codes(codes, categories.astype(object), ordered=True)
     
     # drop
-    to_drop = [x for x in worklog.index if worklog.loc[x, 'user'] in Preprocess.USERS_TO_DROP]
-    to_drop += [x for x in worklog.index if worklog.loc[x, 'user'] in Preprocess.PROJECTS_TO_DROP]
-    worklog = worklog.drop(to_drop)
+    to_drop = (worklog['user'].isin(Preprocess.USERS_TO_DROP) | 
+               worklog['project'].isin(Preprocess.PROJECTS_TO_DROP))
+    worklog = worklog[~to_drop]
+    
+    # date format, days kept as datetime64
+    worklog['date'] = worklog['date'].dt.normalize()
     
-    # date format
-    worklog['date'] = worklog['date'].dt.date
+    # compact hours, calculations are done in double precision
+    worklog['#hours'] = worklog['#hours'].astype('float32')
     
-    # order
-    worklog = worklog.sort_values(by=['date', 'issue', 'user'])
+    return worklog
+
+
+def sort_worklogs(worklog):
+    """
+    Orders cleaned worklogs by date, issue and user. The sort is stable, so 
+    ordering the concatenation of several cleaned parts gives the same result
+    as ordering the whole.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+        Cleaned worklogs.
+
+    Returns
+    -------
+    worklogs : pandas.DataFrame
+        Preprocessed worklogs.
+
+    See Also
+    --------
+    preprocess_worklogs, clean_worklogs
+    """
+    worklog = worklog.take(sort_order(worklog))
     worklog = worklog.reset_index(drop=True)
     
     return worklog
 
 
+def sort_order(worklog):
+    """
+    Obtains the positions of the rows of worklogs ordered by date, issue and
+    user, missing values last, with a stable sort of their integer codes.
+
+    Parameters
+    ----------
+    worklogs : pandas.DataFrame
+        Worklogs including date, issue and user.
+
+    Returns
+    -------
+    order : numpy.ndarray
+        Positions of the rows in order.
+
+    See Also
+    --------
+    sort_worklogs
+    """
+    keys = []
+    for col in ['user', 'issue', 'date']:
+        values = worklog[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # codes in the order of categories, missing (-1) last as unsigned
+            codes = values.cat.codes.values
+            keys.append(codes.view(codes.dtype.str.replace('i', 'u')))
+        else:
+            codes, _ = pd.factorize(values, sort=True)
+            keys.append(np.where(codes < 0, len(codes), codes))
+    
+    return np.lexsort(keys)
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import calculate
+
+
+def make_worklogs(start='2021-01-01', end='2022-12-31', users=4, seed=0):
+    """
+    Builds preprocessed worklogs of a few users logging every working day
+    on their own issues of two projects.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, end)
+    user = np.repeat(['user%d' % i for i in range(users)], len(dates))
+    date = np.tile(dates, users)
+    number = rng.integers(0, 10, len(date)) + np.repeat(np.arange(users) * 10, len(dates))
+    project = np.where(number % 2, 'alpha', 'beta')
+    worklogs = pd.DataFrame({
+        'issue': [p + '-' + str(n) for p, n in zip(project, number)],
+        'summary': np.where(number % 5, 'develop feature', 'team meeting'),
+        'type': np.where(number % 3, 'task', 'bug'),
+        'status': 'closed',
+        'estimate': np.nan,
+        'reporter': 'user0',
+        'project': project,
+        'user': user,
+        'date': date,
+        '#hours': rng.choice([4.0, 8.0], len(date)).astype('float32')
+    })
+    for col in ['issue', 'summary', 'type', 'status', 'reporter', 'project', 'user']:
+        worklogs[col] = worklogs[col].astype('category')
+    
+    return worklogs.sort_values(['user', 'issue', 'date'], ignore_index=True)
+
+
+def test_update_metrics_state_keeps_later_history():
+    worklogs = make_worklogs()
+    state = calculate.build_metrics_state(worklogs, [2021, 2022])
+    export = worklogs[worklogs['date'].between('2021-03-01', '2021-03-31')]
+    
+    updated = calculate.update_metrics_state(state, export)
+    
+    assert len(updated['worklogs']) == len(state['worklogs'])
+    assert updated['worklogs']['date'].max() == state['worklogs']['date'].max()
+    for year, data in state['users_and_metrics'].items():
+        pd.testing.assert_frame_equal(updated['users_and_metrics'][year].loc[data.index, data.columns], data)
+
+
+def test_metrics_by_year_without_enough_hours():
+    worklogs = make_worklogs(end='2023-01-13')
+    
+    full_year = calculate.calculate_metrics_by_year(worklogs, [2022])[0]['2022']
+    partial_year = calculate.calculate_metrics_by_year(worklogs, [2023])[0]['2023']
+    
+    assert len(full_year) == 4
+    assert len(partial_year) == 0
+    by_value = [col for col in full_year.columns if col.startswith('project_') or col.startswith('type_')]
+    assert list(partial_year.columns) == list(full_year.columns.drop(by_value))
+
+
+def test_metrics_by_cohort_without_worklogs():
+    worklogs = make_worklogs()
+    cohorts = {'team': ['user0', 'user1'], 'nobody': ['unknown']}
+    
+    users_and_metrics = calculate.calculate_metrics_by_cohort(worklogs, [2022, 2023], cohorts, workers=1)[0]
+    
+    assert len(users_and_metrics[('team', '2022')]) == 2
+    assert len(users_and_metrics[('team', '2023')]) == 0
+    assert len(users_and_metrics[('nobody', '2022')]) == 0
+
+
+def test_metrics_by_window_longer_than_worklogs():
+    worklogs = make_worklogs()
+    
+    with pytest.raises(ValueError):
+        calculate.calculate_metrics_by_window(worklogs, 'M', 36)